@@ -132,7 +132,7 @@ def get_stereotypes(element):
     names = {c.__name__ for c in cls.__mro__ if issubclass(c, Element)}
 
     # find stereotypes that extend element class
-    classes = model.select(lambda e: e.isKindOf(Class) and e.name in names)
+    classes = (c for c in model.select(Class) if c.name in names)
 
     stereotypes = list({ext.ownedEnd.type for cls in classes for ext in cls.extension})
 
@@ -415,3 +415,10 @@ def swap_element(element, new_class):
     """
     if element.__class__ is not new_class:
         element.__class__ = new_class
+        try:
+            model = element.model
+        except TypeError:
+            # Element is not part of a model
+            return
+        if reindex := getattr(model, "reindex", None):
+            reindex(element)
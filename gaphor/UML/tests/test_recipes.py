@@ -297,3 +297,21 @@ def test_interaction_messages_cloning(element_factory):
 
     assert m2.sendEvent.covered is rl
     assert m2.receiveEvent.covered is sl
+
+
+def test_swap_element_updates_type_index(element_factory):
+    node = element_factory.create(UML.ForkNode)
+
+    UML.recipes.swap_element(node, UML.JoinNode)
+
+    assert type(node) is UML.JoinNode
+    assert element_factory.lselect(UML.JoinNode) == [node]
+    assert not element_factory.lselect(UML.ForkNode)
+
+
+def test_swap_element_without_model():
+    node = UML.ForkNode()
+
+    UML.recipes.swap_element(node, UML.JoinNode)
+
+    assert type(node) is UML.JoinNode
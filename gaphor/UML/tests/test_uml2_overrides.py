@@ -1,4 +1,7 @@
+from io import StringIO
+
 from gaphor import UML
+from gaphor.storage import storage
 
 
 def test_qualified_name():
@@ -13,3 +16,46 @@ def test_qualified_name():
     p2.package = p1
 
     assert p3.qualifiedName == ["package1", "package2", "package3"]
+
+
+def test_class_extension(element_factory):
+    cls = element_factory.create(UML.Class)
+    other = element_factory.create(UML.Class)
+    st1 = element_factory.create(UML.Stereotype)
+    st2 = element_factory.create(UML.Stereotype)
+
+    ext1 = UML.recipes.create_extension(cls, st1)
+    ext2 = UML.recipes.create_extension(cls, st2)
+    UML.recipes.create_extension(other, st1)
+
+    assert cls.extension == [ext1, ext2]
+    assert st1.extension == []
+
+
+def test_class_extension_is_updated_when_extension_is_deleted(element_factory):
+    cls = element_factory.create(UML.Class)
+    st1 = element_factory.create(UML.Stereotype)
+    st2 = element_factory.create(UML.Stereotype)
+    ext1 = UML.recipes.create_extension(cls, st1)
+    ext2 = UML.recipes.create_extension(cls, st2)
+
+    ext1.unlink()
+
+    assert cls.extension == [ext2]
+
+
+def test_class_extension_in_lazy_loaded_model(
+    element_factory, modeling_language, saver
+):
+    cls = element_factory.create(UML.Class)
+    st = element_factory.create(UML.Stereotype)
+    UML.recipes.create_extension(cls, st)
+    cls_id = cls.id
+    data = saver()
+
+    element_factory.flush()
+    storage.load(StringIO(data), element_factory, modeling_language, lazy=True)
+    cls = element_factory.lookup(cls_id)
+
+    assert cls.extension == element_factory.lselect(UML.Extension)
+    assert len(cls.extension) == 1
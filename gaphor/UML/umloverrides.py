@@ -31,6 +31,34 @@ def extension_metaclass(self):
 uml.Extension.metaclass = property(extension_metaclass, doc=extension_metaclass.__doc__)
 
 
+# See https://www.omg.org/spec/UML/2.5/PDF, section 11.8.3.6, page 219
+def class_extension(self):
+    """References the Extensions that specify additional properties of the
+    metaclass. The property is derived from the extensions whose memberEnds
+    are typed by the Class.
+
+    The extensions are found through the typed elements referring to the
+    Class, so there's no need to query the whole model. In a lazy loaded
+    model, the typed elements are loaded together with the Class.
+    """
+    stub = uml.TypedElement.type.stub
+    if not stub:
+        return []
+    return list(
+        dict.fromkeys(
+            assoc
+            for typed_element in stub.get(self)
+            if isinstance(
+                assoc := getattr(typed_element, "association", None), uml.Extension
+            )
+            and assoc.metaclass is self
+        )
+    )
+
+
+uml.Class.extension = property(class_extension, doc=class_extension.__doc__)
+
+
 def property_opposite(self: uml.Property) -> list[uml.Property | None]:
     """In the case where the property is one navigable end of a binary
     association with both ends navigable, this gives the other end.
@@ -27,8 +27,9 @@ import contextlib
 import logging
 import sys
 import textwrap
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable
+from typing import TYPE_CHECKING, Iterable
 
 from gaphor import UML
 from gaphor.codegen.override import Overrides
@@ -40,6 +41,7 @@ from gaphor.core.modeling.modelinglanguage import (
 )
 from gaphor.entrypoint import initialize
 from gaphor.storage import storage
+from gaphor.storage.parser import GaphorLoader, element, parse_generator
 from gaphor.SysML.modelinglanguage import SysMLModelingLanguage
 from gaphor.UML.modelinglanguage import UMLModelingLanguage
 
@@ -76,7 +78,13 @@ def main(
     supermodelfiles: list[tuple[str, str]] | None = None,
     overridesfile: str | None = None,
     outfile: str | None = None,
+    jobs: int | None = 1,
 ):
+    """Generate a data model.
+
+    The model and its super models are parsed in `jobs` processes. If
+    `jobs` is `None`, the number of processors is used.
+    """
     logging.basicConfig()
 
     extra_langs = (
@@ -95,15 +103,14 @@ def main(
         )
     )
 
-    model = load_model(modelfile, modeling_language)
-    super_models = (
-        [
-            (load_modeling_language(lang), load_model(f, modeling_language))
-            for lang, f in supermodelfiles
-        ]
-        if supermodelfiles
-        else []
+    supermodelfiles = supermodelfiles or []
+    model, *super_factories = load_models(
+        [modelfile] + [f for _, f in supermodelfiles], modeling_language, jobs
     )
+    super_models = [
+        (load_modeling_language(lang), factory)
+        for (lang, _), factory in zip(supermodelfiles, super_factories)
+    ]
     overrides = Overrides(overridesfile) if overridesfile else None
 
     with open(outfile, "w", encoding="utf-8") if outfile else contextlib.nullcontext(sys.stdout) as out:  # type: ignore[attr-defined]
@@ -125,6 +132,66 @@ def load_model(modelfile: str, modeling_language: ModelingLanguage) -> ElementFa
     return element_factory
 
 
+def load_models(
+    modelfiles: list[str], modeling_language: ModelingLanguage, jobs: int | None = 1
+) -> list[ElementFactory]:
+    """Load a number of models.
+
+    If more than one job is allowed, the model files are parsed in
+    separate processes. The model elements are created in this process.
+    """
+    if jobs == 1 or len(modelfiles) < 2:
+        return [load_model(f, modeling_language) for f in modelfiles]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        parsed_models = list(executor.map(parse_model, modelfiles))
+
+    return [
+        create_model(gaphor_version, records, modeling_language)
+        for gaphor_version, records in parsed_models
+    ]
+
+
+if TYPE_CHECKING:
+    ElementRecord = tuple[str, str, dict[str, str], dict[str, str | list[str]]]
+
+
+def parse_model(modelfile: str) -> tuple[str, list[ElementRecord]]:
+    """Parse a model file.
+
+    Returns the model version and (id, type, values, references) records
+    for all elements, which can be sent between processes.
+    """
+    loader = GaphorLoader()
+    with open(modelfile, encoding="utf-8") as file_obj:
+        for _ in parse_generator(file_obj, loader):
+            pass
+
+    return loader.gaphor_version, [
+        (e.id, e.type, e.values, e.references) for e in loader.elements.values()
+    ]
+
+
+def create_model(
+    gaphor_version: str,
+    records: list[ElementRecord],
+    modeling_language: ModelingLanguage,
+) -> ElementFactory:
+    """Create a model from parsed element records (see `parse_model()`)."""
+    elements = {}
+    for id, type, values, references in records:
+        elem = elements[id] = element(id, type)
+        elem.values = values
+        elem.references = references
+
+    element_factory = ElementFactory()
+    storage.load_elements(elements, element_factory, modeling_language, gaphor_version)
+
+    resolve_attribute_type_values(element_factory)
+
+    return element_factory
+
+
 def load_modeling_language(lang) -> ModelingLanguage:
     return initialize("gaphor.modelinglanguages", [lang])[lang]
 
@@ -494,9 +561,23 @@ if __name__ == "__main__":
         help="Reference to dependent model file (e.g. UML:models/UML.gaphor)",
     )
 
+    parser.add_argument(
+        "-j",
+        dest="jobs",
+        type=int,
+        default=1,
+        help="Number of processes used to parse model files (0 for all processors)",
+    )
+
     args = parser.parse_args()
     supermodelfiles = (
         [s.split(":") for s in args.supermodelfiles] if args.supermodelfiles else []
     )
 
-    main(args.modelfile, supermodelfiles, args.overridesfile, args.outfile)
+    main(
+        args.modelfile,
+        supermodelfiles,
+        args.overridesfile,
+        args.outfile,
+        args.jobs or None,
+    )
@@ -1,6 +1,8 @@
 """1:n and n:m relations in the data model are saved using a collection."""
 
-from typing import Generic, List, Type, TypeVar, overload
+from __future__ import annotations
+
+from typing import Dict, Generic, Iterable, List, Optional, Type, TypeVar, overload
 
 from gaphor.core.modeling.event import AssociationUpdated
 from gaphor.core.modeling.listmixins import recursemixin, recurseproxy
@@ -41,18 +43,69 @@ class collectionlist(recursemixin, List[T]):  # type: ignore[misc]
     ['foo', 'bar']
     """
 
+    __slots__ = ()
+
 
 class collection(Generic[T]):
-    """Collection (set-like) for model elements' 1:n and n:m relationships."""
+    """Collection (set-like) for model elements' 1:n and n:m relationships.
+
+    Members are kept in an insertion ordered dict, so membership tests
+    take constant time, also for large collections. The ``items`` list is
+    created from the dict when needed, and is kept up to date as members
+    are added and removed.
+    """
+
+    __slots__ = ("property", "object", "type", "_members", "_items")
 
     def __init__(self, property, object, type: Type[T]):
         self.property = property
         self.object = object
         self.type = type
-        self.items: collectionlist[T] = collectionlist()
+        self._members: Dict[T, None] = {}
+        self._items: Optional[collectionlist[T]] = None
+
+    @property
+    def items(self) -> collectionlist[T]:
+        """The members of the collection, in order.
+
+        This list should not be changed in place.
+        """
+        items = self._items
+        if items is None:
+            items = self._items = collectionlist(self._members)
+        return items
+
+    @items.setter
+    def items(self, items: Iterable[T]) -> None:
+        self._items = collectionlist(items)
+        self._members = dict.fromkeys(self._items)
+
+    def _add(self, value: T) -> None:
+        """Add a member, without notifying the property."""
+        self._members[value] = None
+        if self._items is not None:
+            self._items.append(value)
+
+    def _discard(self, value: T) -> bool:
+        """Remove a member, without notifying the property.
+
+        Returns ``True`` if the value was a member.
+        """
+        try:
+            del self._members[value]
+        except KeyError:
+            return False
+        if self._items is not None:
+            self._items.remove(value)
+        return True
+
+    def _move_to_end(self, value: T) -> None:
+        """Move a member to the end of the collection."""
+        if self._discard(value):
+            self._add(value)
 
     def __len__(self) -> int:
-        return len(self.items)
+        return len(self._members)
 
     def __setitem__(self, key, value) -> None:
         raise RuntimeError("items should not be overwritten.")
@@ -72,7 +125,10 @@ class collection(Generic[T]):
         return self.items.__getitem__(key)
 
     def __contains__(self, obj) -> bool:
-        return self.items.__contains__(obj)
+        try:
+            return obj in self._members
+        except TypeError:
+            return False
 
     def __iter__(self):
         return iter(self.items)
@@ -83,7 +139,7 @@ class collection(Generic[T]):
     __repr__ = __str__
 
     def __bool__(self):
-        return self.items != []
+        return bool(self._members)
 
     def append(self, value: T) -> None:
         if isinstance(value, self.type):
@@ -92,7 +148,7 @@ class collection(Generic[T]):
             raise TypeError(f"Object is not of type {self.type.__name__}")
 
     def remove(self, value: T) -> None:
-        if value in self.items:
+        if value in self:
             self.property.delete(self.object, value)
 
     def index(self, key: T) -> int:
@@ -103,10 +159,10 @@ class collection(Generic[T]):
     # OCL members (from SMW by Ivan Porres, http://www.abo.fi/~iporres/smw)
 
     def size(self):
-        return len(self.items)
+        return len(self)
 
     def includes(self, o):
-        return o in self.items
+        return o in self
 
     def excludes(self, o):
         return not self.includes(o)
@@ -115,10 +171,10 @@ class collection(Generic[T]):
         return self.items.count(o)
 
     def includesAll(self, c):
-        return next((0 for o in c if o not in self.items), 1)
+        return next((0 for o in c if o not in self), 1)
 
     def excludesAll(self, c):
-        return next((0 for o in c if o in self.items), 1)
+        return next((0 for o in c if o in self), 1)
 
     def select(self, f):
         return [v for v in self.items if f(v)]
@@ -130,7 +186,7 @@ class collection(Generic[T]):
         return [f(v) for v in self.items]
 
     def isEmpty(self):
-        return len(self.items) == 0
+        return not self._members
 
     def nonEmpty(self):
         return not self.isEmpty()
@@ -140,16 +196,18 @@ class collection(Generic[T]):
 
         Return true if swap was successful.
         """
+        items = list(self.items)
         try:
-            i1 = self.items.index(item1)
-            i2 = self.items.index(item2)
-            self.items[i1], self.items[i2] = self.items[i2], self.items[i1]
-
-            self.object.handle(AssociationUpdated(self.object, self.property))
-            return True
-        except (IndexError, ValueError):
+            i1 = items.index(item1)
+            i2 = items.index(item2)
+        except ValueError:
             return False
+        items[i1], items[i2] = items[i2], items[i1]
+        self.items = items
+
+        self.object.handle(AssociationUpdated(self.object, self.property))
+        return True
 
     def order(self, key):
-        self.items.sort(key=key)
+        self.items = sorted(self.items, key=key)
         self.object.handle(AssociationUpdated(self.object, self.property))
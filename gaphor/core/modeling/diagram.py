@@ -38,7 +38,7 @@ from gaphor.core.modeling.properties import (
     relation_one,
 )
 from gaphor.core.modeling.stylesheet import StyleSheet
-from gaphor.core.styling import Style, StyleNode
+from gaphor.core.styling import CompiledStyleSheet, Style, StyleNode
 from gaphor.i18n import translation
 
 log = logging.getLogger(__name__)
@@ -81,11 +81,21 @@ class DrawContext:
     dropzone: bool
 
 
-@lru_cache()
+@lru_cache(maxsize=None)
+def _attribute_names(cls: type) -> dict[str, str]:
+    """Real attribute names of a class, by lower case (normalized) name."""
+    return {name.lower(): name for name in reversed(dir(cls))}
+
+
 def attrname(obj, lower_name):
     """Look up a real attribute name based on a lower case (normalized)
     name."""
-    return next((name for name in dir(obj) if name.lower() == lower_name), lower_name)
+    if name := _attribute_names(type(obj)).get(lower_name):
+        return name
+    return next(
+        (name for name in getattr(obj, "__dict__", ()) if name.lower() == lower_name),
+        lower_name,
+    )
 
 
 def rgetattr(obj, names):
@@ -135,6 +145,7 @@ class StyledDiagram:
         self.diagram = diagram
         self.selection = selection or gaphas.selection.Selection()
         self.dark_mode = dark_mode
+        self._attributes: dict[str, str] = {}
 
     def name(self) -> str:
         return "diagram"
@@ -150,8 +161,14 @@ class StyledDiagram:
         )
 
     def attribute(self, name: str) -> str:
+        try:
+            return self._attributes[name]
+        except KeyError:
+            pass
         fields = name.split(".")
-        return " ".join(map(attrstr, rgetattr(self.diagram, fields))).strip()
+        a = " ".join(map(attrstr, rgetattr(self.diagram, fields))).strip()
+        self._attributes[name] = a
+        return a
 
     def state(self):
         return ()
@@ -175,6 +192,8 @@ class StyledItem:
         self.diagram = item.diagram
         self.selection = selection
         self.dark_mode = dark_mode
+        # Attribute values, while the style of the item is matched
+        self._attributes: dict[str, str] = {}
 
     def name(self) -> str:
         return type(self.item).__name__.removesuffix("Item").lower()
@@ -192,26 +211,62 @@ class StyledItem:
         return (StyledItem(child, selection) for child in self.item.children)
 
     def attribute(self, name: str) -> str:
+        try:
+            return self._attributes[name]
+        except KeyError:
+            pass
         fields = name.split(".")
         a = " ".join(map(attrstr, rgetattr(self.item, fields))).strip()
         if (not a) and self.item.subject:
             a = " ".join(map(attrstr, rgetattr(self.item.subject, fields))).strip()
+        self._attributes[name] = a
         return a
 
     def state(self) -> Sequence[str]:
-        item = self.item
         selection = self.selection
-        return (
-            (
-                "active" if item in selection.selected_items else "",
-                "focus" if item is selection.focused_item else "",
-                "hover" if item is selection.hovered_item else "",
-                "drop" if item is selection.dropzone_item else "",
-                "disabled" if item in selection.grayed_out_items else "",
-            )
-            if selection
-            else ()
-        )
+        return _item_state(self.item, selection) if selection else ()
+
+
+def _item_state(
+    item: Presentation, selection: gaphas.selection.Selection
+) -> tuple[str, ...]:
+    return (
+        "active" if item in selection.selected_items else "",
+        "focus" if item is selection.focused_item else "",
+        "hover" if item is selection.hovered_item else "",
+        "drop" if item is selection.dropzone_item else "",
+        "disabled" if item in selection.grayed_out_items else "",
+    )
+
+
+def _related_states(node: StyledItem) -> tuple:
+    """The state of an item, its ancestors and its descendants.
+
+    Selectors can match on the state of related items, e.g.
+    ``:hover > *`` and ``:has(:hover)``.
+    """
+    selection = node.selection
+    if not selection:
+        return ()
+
+    def related_items(item):
+        parent = item.parent
+        while parent:
+            yield parent
+            parent = parent.parent
+        yield item
+        yield from descendants(item)
+
+    def descendants(item):
+        for child in item.children:
+            yield child
+            yield from descendants(child)
+
+    return tuple(
+        (related, state)
+        for related in related_items(node.item)
+        if any(state := _item_state(related, selection))
+    )
 
 
 P = TypeVar("P", bound=Presentation)
@@ -236,6 +291,10 @@ class Diagram(Element):
 
         self._registered_views: set[gaphas.model.View] = set()
 
+        # Styles per item, valid for a style sheet and model revision
+        self._styles: dict[Presentation, dict[tuple, Style]] = {}
+        self._styles_valid_for: tuple[CompiledStyleSheet, int] | None = None
+
         self._watcher = self.watcher()
         self._watcher.watch("ownedPresentation", self._owned_presentation_changed)
         self._watcher.watch("ownedPresentation.parent", self._order_owned_presentation)
@@ -259,18 +318,20 @@ class Diagram(Element):
         if event and event.property is not Presentation.parent:
             return
 
-        ownedPresentation = self.ownedPresentation
+        children: dict[Presentation | None, list[Presentation]] = {}
+        for item in self.ownedPresentation:
+            children.setdefault(item.parent, []).append(item)
 
         def traverse_items(parent=None) -> Iterable[Presentation]:
-            for item in ownedPresentation:
-                if item.parent is parent:
-                    yield item
-                    yield from traverse_items(item)
+            for item in children.get(parent, ()):
+                yield item
+                yield from traverse_items(item)
 
         new_order = sorted(
             traverse_items(), key=lambda e: int(isinstance(e, gaphas.Line))
         )
-        self.ownedPresentation.order(new_order.index)
+        positions = {item: n for n, item in enumerate(new_order)}
+        self.ownedPresentation.order(positions.__getitem__)
 
     @property
     def styleSheet(self) -> StyleSheet | None:
@@ -278,7 +339,29 @@ class Diagram(Element):
 
     def style(self, node: StyleNode) -> Style:
         style_sheet = self.styleSheet
-        return style_sheet.match(node) if style_sheet else FALLBACK_STYLE
+        if not style_sheet:
+            return FALLBACK_STYLE
+        if not (isinstance(node, StyledItem) and node.diagram is self):
+            return style_sheet.match(node)
+
+        # Styles are kept until the style sheet is compiled again, or
+        # an element in the model changes.
+        valid_for = (style_sheet.compiled_style_sheet, self.model.revision)
+        if valid_for != self._styles_valid_for:
+            self._styles.clear()
+            self._styles_valid_for = valid_for
+
+        item = node.item
+        key = (node.dark_mode, _related_states(node))
+        try:
+            styles = self._styles[item]
+        except KeyError:
+            styles = self._styles[item] = {}
+        try:
+            return styles[key]
+        except KeyError:
+            style = styles[key] = style_sheet.match(node)
+            return style
 
     def gettext(self, message):
         """Translate a message to the language used in the model."""
@@ -391,6 +474,8 @@ class Diagram(Element):
                 yield from gaphas.canvas.ancestors(self, item)
 
         for item in reversed(list(self.sort(dirty_items_with_ancestors()))):
+            # Item state, such as connections, can change the style
+            self._styles.pop(item, None)
             if update := getattr(item, "update", None):
                 update(UpdateContext(style=self.style(StyledItem(item))))
 
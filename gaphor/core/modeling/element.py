@@ -6,6 +6,7 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING, Callable, Iterator, Protocol, TypeVar, overload
 from uuid import uuid1
+from weakref import WeakKeyDictionary
 
 from gaphor.core.modeling.event import ElementUpdated
 from gaphor.core.modeling.properties import (
@@ -39,6 +40,11 @@ class UnlinkEvent:
 
 Id = str
 
+# Per class: (property generation, properties)
+_umlproperties: WeakKeyDictionary[
+    type, tuple[int, tuple[umlproperty, ...]]
+] = WeakKeyDictionary()
+
 
 def uuid_generator():
     while True:
@@ -68,7 +74,13 @@ def self_and_owners(element: Element | None) -> Iterator[Element]:
 
 
 class Element:
-    """Base class for all model data classes."""
+    """Base class for all model data classes.
+
+    Property values are stored as instance attributes. The attributes all
+    elements have are stored in slots.
+    """
+
+    __slots__ = ("_id", "_model", "_unlink_lock", "__dict__", "__weakref__")
 
     note: attribute[str] = attribute("note", str)
     comment: relation_many[Comment]
@@ -113,14 +125,32 @@ class Element:
         return self._model
 
     @classmethod
-    def umlproperties(cls) -> Iterator[umlproperty]:
-        """Iterate over all properties."""
-        umlprop = umlproperty
-        for propname in dir(cls):
-            if not propname.startswith("_"):
-                prop = getattr(cls, propname)
-                if isinstance(prop, umlprop):
-                    yield prop
+    def umlproperties(cls) -> tuple[umlproperty, ...]:
+        """All properties, ordered by name.
+
+        The properties are looked up once per class. Properties are
+        assigned to classes after the class is defined, e.g. by the
+        generated model modules or by association stubs. Every new
+        property increments `umlproperty.generation`, so the properties
+        are looked up again.
+        """
+        generation = umlproperty.generation
+        try:
+            cached_generation, props = _umlproperties[cls]
+        except KeyError:
+            pass
+        else:
+            if cached_generation == generation:
+                return props
+
+        props = tuple(
+            prop
+            for propname in dir(cls)
+            if not propname.startswith("_")
+            and isinstance(prop := getattr(cls, propname), umlproperty)
+        )
+        _umlproperties[cls] = (generation, props)
+        return props
 
     def save(self, save_func):
         """Save the state by calling save_func(name, value)."""
@@ -231,6 +261,13 @@ class RepositoryProtocol(Protocol):
     def lookup(self, id: str) -> Element | None:
         ...
 
+    def reindex(self, element: Element) -> None:
+        ...
+
+    @property
+    def revision(self) -> int:
+        ...
+
     def watcher(
         self, element: Element, default_handler: Handler | None = None
     ) -> EventWatcherProtocol:
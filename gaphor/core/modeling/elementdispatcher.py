@@ -12,6 +12,7 @@ from gaphor.core.modeling.event import (
     AssociationDeleted,
     AssociationSet,
     ElementUpdated,
+    ModelFlushed,
     ModelReady,
 )
 from gaphor.core.modeling.properties import umlproperty
@@ -115,15 +116,25 @@ class ElementDispatcher(Service):
         # handler: [(element, property), ..]
         self._reverse: dict[Handler, list[tuple[Element, umlproperty]]] = {}
 
+        # Parsed paths, the same paths are subscribed to for every item:
+        # (type(element), path): (property, ..)
+        self._paths: dict[tuple[type[Element], str], tuple[umlproperty, ...]] = {}
+
         self.event_manager.subscribe(self.on_model_loaded)
+        self.event_manager.subscribe(self.on_model_flushed)
         self.event_manager.subscribe(self.on_element_change_event)
 
     def shutdown(self) -> None:
         self.event_manager.unsubscribe(self.on_element_change_event)
+        self.event_manager.unsubscribe(self.on_model_flushed)
         self.event_manager.unsubscribe(self.on_model_loaded)
 
     def subscribe(self, handler: Handler, element: Element, path: str) -> None:
-        props = self._path_to_properties(element, path)
+        key = (type(element), path)
+        try:
+            props = self._paths[key]
+        except KeyError:
+            props = self._paths[key] = self._path_to_properties(element, path)
         self._add_handlers(element, props, handler)
 
     def unsubscribe(self, handler: Handler) -> None:
@@ -264,3 +275,24 @@ class ElementDispatcher(Service):
             for h, remainders in list(value.items()):
                 for remainder in remainders:
                     self._add_handlers(elem, prefix + remainder, h)
+
+    @event_handler(ModelFlushed)
+    def on_model_flushed(self, event):
+        # Elements are not unlinked one by one, so handlers are not
+        # unsubscribed either.
+        self._handlers.clear()
+        self._reverse.clear()
+
+    def reconnect(self, element: Element) -> None:
+        """Apply the paths of handlers registered on an element again.
+
+        This is required if the element is loaded without emitting
+        events, as lazy loaded elements are.
+        """
+        handlers = self._handlers
+        for prop in type(element).umlproperties():
+            if value := handlers.get((element, prop)):
+                prefix = (prop,)
+                for h, remainders in list(value.items()):
+                    for remainder in remainders:
+                        self._add_handlers(element, prefix + remainder, h)
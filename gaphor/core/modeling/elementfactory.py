@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import heapq
 from collections import OrderedDict
 from contextlib import contextmanager
+from functools import lru_cache
+from itertools import count
 from typing import Callable, Iterator, Protocol, TypeVar, overload
 
 from gaphor.abc import Service
@@ -22,6 +25,7 @@ from gaphor.core.modeling.elementdispatcher import ElementDispatcher, EventWatch
 from gaphor.core.modeling.event import (
     ElementCreated,
     ElementDeleted,
+    ElementUpdated,
     ModelFlushed,
     ModelReady,
 )
@@ -49,6 +53,57 @@ class RecordingEventManager:
             self.event_manager.handle(*self.events)
 
 
+# Attributes that can be accessed without loading a lazy element
+_LAZY_ATTRIBUTES = frozenset(("_id", "_model", "_unlink_lock", "id", "__class__"))
+
+
+class _LazyElement:
+    """Mixin for elements that are not loaded yet.
+
+    The element is loaded as soon as one of its attributes is accessed. While
+    other elements are loaded, private attributes can be accessed, so
+    associations can be updated on both ends.
+    """
+
+    __slots__ = ()
+
+    def __getattribute__(self, name):
+        if name not in _LAZY_ATTRIBUTES:
+            _materialize(self, name)
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+        if name not in _LAZY_ATTRIBUTES:
+            _materialize(self, name)
+        _element_type(self).__setattr__(self, name, value)
+
+
+def _materialize(element: _LazyElement, name: str) -> None:
+    model = object.__getattribute__(element, "_model")
+    if not (model._loading and name.startswith("_")):
+        model._materialize(element)
+
+
+@lru_cache(maxsize=None)
+def _lazy_class(cls: type[T]) -> type[T]:
+    return type(  # type: ignore[return-value]
+        cls.__name__,
+        (_LazyElement, cls),
+        {
+            "__slots__": (),
+            "__module__": cls.__module__,
+            "__qualname__": cls.__qualname__,
+        },
+    )
+
+
+def _element_type(element: Element) -> type[Element]:
+    element_type = type(element)
+    if issubclass(element_type, _LazyElement):
+        return element_type.__bases__[1]  # type: ignore[no-any-return]
+    return element_type
+
+
 class ElementFactory(Service):
     """The ElementFactory is used to create elements and do lookups to
     elements.
@@ -69,6 +124,17 @@ class ElementFactory(Service):
         self.event_manager: EventHandler | None = event_manager
         self.element_dispatcher = element_dispatcher
         self._elements: dict[Id, Element] = OrderedDict()
+        # Elements per concrete type, to select elements by type quickly
+        self._elements_by_type: dict[type[Element], dict[Id, Element]] = {}
+        self._types_by_query: dict[type, tuple[type[Element], ...]] = {}
+        self._sequence: dict[Id, int] = {}
+        self._counter = count()
+        # Lazy elements that are not loaded yet: id -> (diagram, loader)
+        self._lazy: dict[Id, tuple[Diagram | None, Callable[[Element], None]]] = {}
+        self._loading = 0
+        self._postloading = False
+        self._materialized: list[Element] = []
+        self._revision = 0
         if event_manager:
             event_manager.subscribe(self._on_unlink_event)
 
@@ -111,15 +177,105 @@ class ElementFactory(Service):
         event_recorder = RecordingEventManager(self.event_manager)
         with self.block_events(event_recorder):
             element = type(id=id, **type_args)  # type: ignore[arg-type]
-        self._elements[id] = element
+        self._add_element(element)
         self.handle(ElementCreated(self, element, diagram))
         event_recorder.replay()
         return element
 
+    def create_lazy(
+        self,
+        type: type[T],
+        id: Id,
+        loader: Callable[[Element], None],
+        diagram: Diagram | None = None,
+    ) -> T:
+        """Create a model element that is loaded when it's first accessed.
+
+        Until then, only the id and type of the element are known. Once
+        an attribute of the element is accessed, the element is initialized
+        and ``loader(element)`` is called to load its content. Then the
+        element is post-loaded. No events are emitted while the element is
+        loaded.
+
+        Like `create_as()`, this method should only be used when loading
+        models.
+        """
+        if id in self._elements:
+            raise TypeError(f"Element with id {id} already exists")
+        if issubclass(type, Presentation) and not diagram:
+            raise TypeError("Presentation types require a diagram")
+
+        lazy_type = _lazy_class(type)
+        element = lazy_type.__new__(lazy_type)
+        element._id = id
+        element._model = self
+        element._unlink_lock = 0
+        self._lazy[id] = (diagram, loader)
+        self._add_element(element)
+        return element
+
+    def materialize(self, element: Element) -> None:
+        """Load a lazy element, if it's not loaded yet.
+
+        A loader can use this to load related elements along with
+        the element it loads.
+        """
+        if isinstance(element, _LazyElement):
+            self._materialize(element)
+
+    def _materialize(self, element: Element) -> None:
+        element.__class__ = type(element).__bases__[1]
+        try:
+            diagram, loader = self._lazy.pop(element.id)
+        except KeyError:
+            return
+
+        type_args: dict[str, Diagram | RepositoryProtocol] = (
+            {"diagram": diagram} if diagram else {"model": self}
+        )
+        self._loading += 1
+        try:
+            with self.block_events():
+                element.__init__(id=element.id, **type_args)  # type: ignore[misc]
+                loader(element)
+        finally:
+            self._loading -= 1
+
+        materialized = self._materialized
+        materialized.append(element)
+        if self._loading or self._postloading:
+            return
+
+        # Like a model load, post-load once the values of all elements
+        # are loaded. Elements loaded in the mean time are added to the queue.
+        self._postloading = True
+        try:
+            with self.block_events():
+                for e in materialized:
+                    e.postload()
+        finally:
+            self._postloading = False
+            self._materialized = []
+
+        # Watchers are set up while the element is initialized, before
+        # its content is loaded.
+        if self.element_dispatcher:
+            for e in materialized:
+                self.element_dispatcher.reconnect(e)
+
     def size(self) -> int:
         """Return the amount of elements currently in the factory."""
         return len(self._elements)
 
+    @property
+    def revision(self) -> int:
+        """A number that changes every time an element is updated.
+
+        It can be used to cache data derived from the model, such as
+        styles.
+        """
+        return self._revision
+
     def lookup(self, id: Id) -> Element | None:
         """Find element with a specific id."""
         return self._elements.get(id)
@@ -151,7 +307,7 @@ class ElementFactory(Service):
         if expression is None:
             yield from self._elements.values()
         elif isinstance(expression, type):
-            yield from (e for e in self._elements.values() if isinstance(e, expression))
+            yield from self._select_type(expression)
         else:
             yield from (e for e in self._elements.values() if expression(e))
 
@@ -167,6 +323,66 @@ class ElementFactory(Service):
         """
         return list(self.select(expression))
 
+    def reindex(self, element: Element) -> None:
+        """Update the type index after the class of an element changed."""
+        id = element.id
+        if self._elements.get(id) is not element:
+            return
+        for by_type in self._elements_by_type.values():
+            by_type.pop(id, None)
+        self._index_type(element)
+        # Keep elements in creation order
+        element_type = type(element)
+        sequence = self._sequence
+        self._elements_by_type[element_type] = dict(
+            sorted(
+                self._elements_by_type[element_type].items(),
+                key=lambda item: sequence[item[0]],
+            )
+        )
+
+    def _add_element(self, element: Element) -> None:
+        id = element.id
+        self._elements[id] = element
+        self._sequence[id] = next(self._counter)
+        self._index_type(element)
+
+    def _index_type(self, element: Element) -> None:
+        id = element.id
+        element_type = _element_type(element)
+        try:
+            self._elements_by_type[element_type][id] = element
+        except KeyError:
+            self._elements_by_type[element_type] = {id: element}
+            self._types_by_query.clear()
+
+    def _remove_element(self, element: Element) -> bool:
+        id = element.id
+        try:
+            removed = self._elements.pop(id)
+        except KeyError:
+            return False
+        del self._sequence[id]
+        del self._elements_by_type[_element_type(removed)][id]
+        return True
+
+    def _select_type(self, query: type) -> Iterator[Element]:
+        """Iterate elements of a type, in the order they were created."""
+        try:
+            types = self._types_by_query[query]
+        except KeyError:
+            types = self._types_by_query[query] = tuple(
+                t for t in self._elements_by_type if issubclass(t, query)
+            )
+
+        buckets = [b for b in map(self._elements_by_type.__getitem__, types) if b]
+        if not buckets:
+            return iter(())
+        if len(buckets) == 1:
+            return iter(buckets[0].values())
+        sequence = self._sequence
+        return heapq.merge(*(b.values() for b in buckets), key=lambda e: sequence[e.id])
+
     def keys(self) -> Iterator[Id]:
         """Return a list with all id's in the factory."""
         return iter(self._elements.keys())
@@ -188,16 +404,34 @@ class ElementFactory(Service):
     def flush(self) -> None:
         """Flush all elements (remove them from the factory).
 
-        Diagram elements are flushed first. The remaining elements are
-        flushed next.
+        The model is removed as a whole: elements are not unlinked one by
+        one. Instead, the property values of all elements, and with that all
+        references between elements, are dropped at once. No events are
+        emitted for individual elements, only a `ModelFlushed` event.
         """
-        with self.block_events():
-            for element in self.lselect(Diagram):
-                assert isinstance(element, Diagram)
-                element.unlink()
-
-            for element in self.lselect():
-                element.unlink()
+        elements = list(self._elements.values())
+        self._elements.clear()
+        self._elements_by_type.clear()
+        self._types_by_query.clear()
+        self._sequence.clear()
+        self._lazy.clear()
+
+        storage_names: dict[type[Element], frozenset[str]] = {}
+        for element in elements:
+            element_type = _element_type(element)
+            if type(element) is not element_type:
+                # Lazy elements are not loaded
+                element.__class__ = element_type
+            try:
+                names = storage_names[element_type]
+            except KeyError:
+                names = storage_names[element_type] = frozenset(
+                    prop._name for prop in element_type.umlproperties()
+                )
+            values = element.__dict__
+            for name in names.intersection(values):
+                del values[name]
+            element._model = None
 
         self.handle(ModelFlushed(self))
 
@@ -222,6 +456,8 @@ class ElementFactory(Service):
 
     def handle(self, event: object) -> None:
         """Handle events coming from elements."""
+        if isinstance(event, ElementUpdated):
+            self._revision += 1
         if self.event_manager:
             self.event_manager.handle(event)
         elif isinstance(event, UnlinkEvent):
@@ -232,9 +468,7 @@ class ElementFactory(Service):
         element = event.element
         element._model = None
         assert isinstance(element.id, Id)
-        try:
-            del self._elements[element.id]
-        except KeyError:
+        if not self._remove_element(element):
             return
         if self.event_manager:
             self.event_manager.handle(
@@ -157,6 +157,8 @@ class recursemixin(Generic[T]):
     ['b', 'c', 'd', 'one', 'two']
     """
 
+    __slots__ = ()
+
     _recursemixin_trigger = slice(None, None, None)
 
     def proxy_class(self):
@@ -1,7 +1,10 @@
 """C4 Model Language entrypoint."""
 
+from __future__ import annotations
+
 from gaphor.abc import ModelingLanguage
 from gaphor.core.modeling import coremodel
+from gaphor.core.modeling.element import Element
 
 
 class CoreModelingLanguage(ModelingLanguage):
@@ -26,6 +29,7 @@ class MockModelingLanguage(ModelingLanguage):
 
     def __init__(self, *modeling_languages: ModelingLanguage):
         self._modeling_languages = modeling_languages
+        self._element_types: dict[str, type[Element] | None] = {}
 
     @property
     def name(self) -> str:
@@ -40,13 +44,17 @@ class MockModelingLanguage(ModelingLanguage):
         return ()
 
     def lookup_element(self, name):
-        return next(
-            filter(
+        try:
+            return self._element_types[name]
+        except KeyError:
+            element_type = self._element_types[name] = next(
+                filter(
+                    None,
+                    (
+                        provider.lookup_element(name)
+                        for provider in self._modeling_languages
+                    ),
+                ),
                 None,
-                [
-                    provider.lookup_element(name)
-                    for provider in self._modeling_languages
-                ],
-            ),
-            None,
-        )
+            )
+            return element_type
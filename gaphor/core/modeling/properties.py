@@ -137,7 +137,12 @@ class umlproperty:
     lower: Lower = 0
     upper: Upper = 1
 
+    # Incremented for every new property. Used to tell if properties
+    # looked up for a class are still valid.
+    generation = 0
+
     def __init__(self, name: str):
+        umlproperty.generation += 1
         self._dependent_properties: set[derived | redefine] = set()
         self.name = name
         self._name = f"_{name}"
@@ -158,7 +163,13 @@ class umlproperty:
         if hasattr(obj, self._name):
             save_func(self.name, self.get(obj))
 
-    def load(self, obj, value):
+    def load(self, obj, value, do_notify=True):
+        """Load a value.
+
+        If ``do_notify`` is false, properties can skip sending events and
+        updating derived properties. This is used when loading a complete
+        model, followed by a ``postload()`` of all elements.
+        """
         self.set(obj, value)
 
     def postload(self, obj):
@@ -199,9 +210,9 @@ class attribute(umlproperty, Generic[T]):
         self.type = type
         self.default: str | int | None = default
 
-    def load(self, obj, value: str | None):
+    def load(self, obj, value: str | None, do_notify=True):
         """Load the attribute value."""
-        self.set(obj, value)
+        self.set(obj, value, do_notify)
 
     def unlink(self, obj):
         self.set(obj, self.default)
@@ -212,7 +223,7 @@ class attribute(umlproperty, Generic[T]):
     def get(self, obj):
         return getattr(obj, self._name, self.default)
 
-    def set(self, obj, value):
+    def set(self, obj, value, do_notify=True):
         if (
             value is not None
             and not isinstance(value, self.type)
@@ -235,7 +246,8 @@ class attribute(umlproperty, Generic[T]):
             delattr(obj, self._name)
         else:
             setattr(obj, self._name, value)
-        self.handle(AttributeUpdated(obj, self, old, value))
+        if do_notify:
+            self.handle(AttributeUpdated(obj, self, old, value))
 
     def delete(self, obj, value=None):
         old = self.get(obj)
@@ -270,13 +282,13 @@ class enumeration(umlproperty):
     def get(self, obj):
         return getattr(obj, self._name, self.default)
 
-    def load(self, obj, value: str | None):
-        self.set(obj, self.default if value is None else value)
+    def load(self, obj, value: str | None, do_notify=True):
+        self.set(obj, self.default if value is None else value, do_notify)
 
     def unlink(self, obj):
         self.set(obj, self.default)
 
-    def set(self, obj, value):
+    def set(self, obj, value, do_notify=True):
         if value not in self.values:
             raise TypeError(f"Value should be one of {str(self.values)}")
         old = self.get(obj)
@@ -287,7 +299,8 @@ class enumeration(umlproperty):
             delattr(obj, self._name)
         else:
             setattr(obj, self._name, value)
-        self.handle(AttributeUpdated(obj, self, old, value))
+        if do_notify:
+            self.handle(AttributeUpdated(obj, self, old, value))
 
     def delete(self, obj, value=None):
         old = self.get(obj)
@@ -334,16 +347,22 @@ class association(umlproperty):
             if v := self.get(obj):
                 save_func(self.name, v)
 
-    def load(self, obj, value):
+    def load(self, obj, value, do_notify=True):
         if self.opposite:
             # Loading should not steal references from other elements
             opposite = getattr(type(value), self.opposite)
-            if opposite.upper == 1 and (opval := opposite.get(value)):
-                if opval is not obj:
-                    log.debug(f"Cannot steal reference from {value}")
+            opval = opposite.get(value) if opposite.upper == 1 else None
+            if opval and opval is not obj:
+                log.debug(f"Cannot steal reference from {value}")
                 return
 
-        self.set(obj, value)
+        if self.upper == 1:
+            self.set(obj, value, do_notify=do_notify)
+        elif obj is value:
+            raise TypeError(f"Can not set {obj}.{self.name} to itself")
+        else:
+            # Keep the order of the loaded references
+            self._set_many(obj, value, do_notify=do_notify, from_load=True)
 
     def __str__(self):
         if self.lower == self.upper:
@@ -369,7 +388,7 @@ class association(umlproperty):
             setattr(obj, self._name, v)
         return v
 
-    def set(self, obj, value: T | None, from_opposite=False) -> None:
+    def set(self, obj, value: T | None, from_opposite=False, do_notify=True) -> None:
         """Set a new value for our attribute. If this is a collection, append
         to the existing collection.
 
@@ -379,11 +398,11 @@ class association(umlproperty):
             raise TypeError(f"Can not set {obj}.{self.name} to itself")
 
         if self.upper == 1:
-            self._set_one(obj, value, from_opposite)
+            self._set_one(obj, value, from_opposite, do_notify)
         else:
-            self._set_many(obj, value, from_opposite)
+            self._set_many(obj, value, from_opposite, do_notify)
 
-    def _set_one(self, obj, value, from_opposite=False) -> None:
+    def _set_one(self, obj, value, from_opposite=False, do_notify=True) -> None:
         if not (isinstance(value, self.type) or (value is None)):
             raise TypeError(
                 f"Value should be of type {self.type.__name__}, got a {type(value)} instead"
@@ -402,14 +421,17 @@ class association(umlproperty):
         if value is not None:
             setattr(obj, self._name, value)
             try:
-                self._set_opposite(obj, value, from_opposite)
+                self._set_opposite(obj, value, from_opposite, do_notify)
             except Exception:
                 setattr(obj, self._name, old)
                 raise
 
-        self.handle(AssociationSet(obj, self, old, value))
+        if do_notify:
+            self.handle(AssociationSet(obj, self, old, value))
 
-    def _set_many(self, obj, value, from_opposite=False, from_load=False) -> None:
+    def _set_many(
+        self, obj, value, from_opposite=False, do_notify=True, from_load=False
+    ) -> None:
         if not isinstance(value, self.type):
             raise TypeError(f"Value should be of type {self.type.__name__}")
 
@@ -417,26 +439,27 @@ class association(umlproperty):
         c: collection = self._get_many(obj)
         if value in c:
             if from_load:
-                c.items.remove(value)
-                c.items.append(value)
+                c._move_to_end(value)
             return
 
-        c.items.append(value)
+        c._add(value)
         try:
-            self._set_opposite(obj, value, from_opposite)
+            self._set_opposite(obj, value, from_opposite, do_notify)
         except Exception:
-            if value in c.items:
-                c.items.remove(value)
+            c._discard(value)
             raise
 
-        self.handle(AssociationAdded(obj, self, value))
+        if do_notify:
+            self.handle(AssociationAdded(obj, self, value))
 
-    def _set_opposite(self, obj, value: T | None, from_opposite=False) -> None:
+    def _set_opposite(
+        self, obj, value: T | None, from_opposite=False, do_notify=True
+    ) -> None:
         if not from_opposite and self.opposite:
             opposite = getattr(type(value), self.opposite)
             if not opposite.opposite:
                 opposite.stub = self
-            opposite.set(value, obj, from_opposite=True)
+            opposite.set(value, obj, from_opposite=True, do_notify=do_notify)
         elif not self.opposite:
             if not self.stub:
                 self.stub = associationstub(self)
@@ -476,17 +499,11 @@ class association(umlproperty):
 
         c: collection
         if c := self._get_many(obj):
-            items: collectionlist = c.items
-            try:
-                items.remove(value)
-            except ValueError:
-                pass
-            else:
-                if do_notify:
-                    self.handle(AssociationDeleted(obj, self, value))
+            if c._discard(value) and do_notify:
+                self.handle(AssociationDeleted(obj, self, value))
 
             # Remove items collection if empty
-            if not items:
+            if not c:
                 delattr(obj, self._name)
 
     def _del_opposite(self, obj, value, from_opposite):
@@ -539,19 +556,23 @@ class associationstub(umlproperty):
     def save(self, obj, save_func):
         pass
 
-    def load(self, obj, value):
+    def load(self, obj, value, do_notify=True):
         pass
 
     def unlink(self, obj):
-        values = getattr(obj, self._name, [])
-        for value in set(values):
+        values = getattr(obj, self._name, {})
+        for value in list(values):
             self.association.delete(value, obj)
 
+    def get(self, obj) -> list:
+        """The elements referring to ``obj``, in the order they were set."""
+        return list(getattr(obj, self._name, ()))
+
     def set(self, obj, value):
         try:
-            getattr(obj, self._name).add(value)
+            getattr(obj, self._name)[value] = None
         except AttributeError:
-            setattr(obj, self._name, {value})
+            setattr(obj, self._name, {value: None})
 
     def delete(self, obj, value, from_opposite=False):
         try:
@@ -559,12 +580,14 @@ class associationstub(umlproperty):
         except AttributeError:
             pass
         else:
-            c.discard(value)
+            c.pop(value, None)
 
 
 class unioncache:
     """Small cache helper object for derivedunions."""
 
+    __slots__ = ("owner", "data", "version")
+
     def __init__(self, owner: object, data: object, version: int) -> None:
         self.owner = owner
         self.data = data
@@ -602,6 +625,7 @@ class derived(umlproperty, Generic[T]):
         self.filter = filter
         self.subsets: set[umlproperty] = set()
         self.single = False
+        self._local: bool | None = None
 
         for s in subsets:
             self.add(s)
@@ -613,14 +637,48 @@ class derived(umlproperty, Generic[T]):
             subset, (association, derived)
         ), f"have element {subset}, expected association"
         subset._dependent_properties.add(self)
+        self._subsets_changed()
+
+    def _subsets_changed(self):
+        self._local = None
+        for d in self._dependent_properties:
+            if isinstance(d, derived):
+                d._subsets_changed()
+
+    @property
+    def local(self) -> bool:
+        """The value only depends on properties of the element itself.
+
+        A derived property with a custom filter can depend on any
+        element in the model.
+        """
+        return False
+
+    def invalidate(self, obj):
+        """Make sure the value is created again.
+
+        For local properties, only the cached value of ``obj`` is dropped.
+        Otherwise the values are created again for all elements.
+        """
+        if self.local:
+            try:
+                delattr(obj, self._name)
+            except AttributeError:
+                pass
+        else:
+            self.invalidate_all()
+
+    def invalidate_all(self):
+        """Make sure the values are created again for all elements."""
+        self.version += 1
 
-    def load(self, obj, value):
+    def load(self, obj, value, do_notify=True):
         raise ValueError(
             f"Derivedunion: Properties should not be loaded in a derived union {self.name}: {value}"
         )
 
     def postload(self, obj):
-        self.version += 1
+        self.invalidate(obj)
         if self.upper == 1:
             u = self.filter(obj)
             assert (
@@ -684,13 +742,13 @@ class derived(umlproperty, Generic[T]):
         if self.upper == 1:
             old_value = hasattr(event.element, self._name) and self.get(event.element)
             # Make sure unions are created again
-            self.version += 1
+            self.invalidate(event.element)
             new_value = self.get(event.element)
             if old_value != new_value:
                 self.handle(DerivedSet(event.element, self, old_value, new_value))
         else:
             # Make sure unions are created again
-            self.version += 1
+            self.invalidate(event.element)
 
             if isinstance(event, AssociationSet):
                 self.handle(DerivedDeleted(event.element, self, event.old_value))
@@ -737,6 +795,19 @@ class derivedunion(derived[T]):
     ):
         super().__init__(name, type, lower, upper, self._union, *subsets)
 
+    @property
+    def local(self) -> bool:
+        """A union is local if all its subsets are local.
+
+        A union is created from the subsets of the element itself.
+        """
+        if self._local is None:
+            self._local = all(
+                isinstance(s, association) or (isinstance(s, derived) and s.local)
+                for s in self.subsets
+            )
+        return self._local
+
     def _union(self, obj, exclude=None):
         """Returns a union of all values as a set."""
         u: set[T] = set()
@@ -762,7 +833,7 @@ class derivedunion(derived[T]):
         if event.property not in self.subsets:
             return
         # Make sure unions are created again
-        self.version += 1
+        self.invalidate(event.element)
 
         if not isinstance(event, AssociationUpdated):
             return
@@ -847,9 +918,9 @@ class redefine(umlproperty):
             self.original.composite if isinstance(self.original, association) else False
         )
 
-    def load(self, obj, value):
+    def load(self, obj, value, do_notify=True):
         if self.original.name == self.name:
-            self.original.load(obj, value)
+            self.original.load(obj, value, do_notify)
 
     def postload(self, obj):
         if self.original.name == self.name:
@@ -869,13 +940,13 @@ class redefine(umlproperty):
     def get(self, obj):
         return self.original.get(obj)
 
-    def set(self, obj, value, from_opposite=False):
+    def set(self, obj, value, from_opposite=False, do_notify=True):
         if not (isinstance(value, self.type) or (self.upper == 1 and value is None)):
             raise TypeError(
                 f"Value should be of type {self.type.__name__}, got a {type(value)} instead"
             )
         assert isinstance(self.original, association)
-        return self.original.set(obj, value, from_opposite)
+        return self.original.set(obj, value, from_opposite, do_notify)
 
     def delete(self, obj, value, from_opposite=False, do_notify=True):
         assert isinstance(self.original, association)
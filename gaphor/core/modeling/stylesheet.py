@@ -62,12 +62,12 @@ DEFAULT_STYLE_SHEET = textwrap.dedent(
 
 
 class StyleSheet(Element):
-    _compiled_style_sheet: CompiledStyleSheet
+    _compiled_style_sheet: CompiledStyleSheet | None
 
     def __init__(self, id=None, model=None):
         super().__init__(id, model)
         self._system_font_family = "sans"
-        self.compile_style_sheet()
+        self._compiled_style_sheet = None
 
     styleSheet: attribute[str] = attribute("styleSheet", str, DEFAULT_STYLE_SHEET)
     naturalLanguage: attribute[str] = attribute("naturalLanguage", str)
@@ -79,21 +79,28 @@ class StyleSheet(Element):
     @system_font_family.setter
     def system_font_family(self, font_family: str):
         self._system_font_family = font_family
-        self.compile_style_sheet()
+        self._compiled_style_sheet = None
 
-    def compile_style_sheet(self) -> None:
+    def compile_style_sheet(self) -> CompiledStyleSheet:
         self._compiled_style_sheet = CompiledStyleSheet(
             SYSTEM_STYLE_SHEET,
             f"* {{ font-family: {self._system_font_family} }}",
             self.styleSheet,
         )
+        return self._compiled_style_sheet
+
+    @property
+    def compiled_style_sheet(self) -> CompiledStyleSheet:
+        # The style sheet is compiled when it's used, so a series
+        # of changes results in only one compilation.
+        return self._compiled_style_sheet or self.compile_style_sheet()
 
     def match(self, node: StyleNode) -> Style:
-        return self._compiled_style_sheet.match(node)
+        return self.compiled_style_sheet.match(node)
 
     def postload(self):
         super().postload()
-        self.compile_style_sheet()
+        self._compiled_style_sheet = None
 
     def handle(self, event):
         # Ensure compiled style sheet is always up-to-date:
@@ -101,6 +108,6 @@ class StyleSheet(Element):
             isinstance(event, AttributeUpdated)
             and event.property is StyleSheet.styleSheet
         ):
-            self.compile_style_sheet()
+            self._compiled_style_sheet = None
 
         super().handle(event)
@@ -134,3 +134,52 @@ def test_swap():
     c.swap("a", "c")
     assert c.items == ["c", "b", "a"]
     assert o.events
+
+
+def test_order():
+    o = MockElement()
+    c: collection[str] = collection(None, o, str)
+    c.items = ["b", "c", "a"]  # type: ignore[assignment]
+    c.order(lambda e: e)
+
+    assert c.items == ["a", "b", "c"]
+    assert list(c) == ["a", "b", "c"]
+    assert o.events
+
+
+def test_add_and_discard_keep_order():
+    c: collection[str] = collection(None, None, str)
+    for v in "abcd":
+        c._add(v)
+
+    assert c._discard("b")
+    assert not c._discard("b")
+    assert "b" not in c
+    assert c.items == ["a", "c", "d"]
+    assert c[1] == "c"
+
+
+def test_discard_keeps_items_list_up_to_date():
+    c: collection[str] = collection(None, None, str)
+    c.items = ["a", "b", "c"]  # type: ignore[assignment]
+    items = c.items
+
+    c._discard("b")
+
+    assert c.items is items
+    assert items == ["a", "c"]
+
+
+def test_move_to_end():
+    c: collection[str] = collection(None, None, str)
+    c.items = ["a", "b", "c"]  # type: ignore[assignment]
+    c._move_to_end("a")
+
+    assert c.items == ["b", "c", "a"]
+
+
+def test_unhashable_value_is_not_contained():
+    c: collection[str] = collection(None, None, str)
+    c.items = ["a"]  # type: ignore[assignment]
+
+    assert [] not in c
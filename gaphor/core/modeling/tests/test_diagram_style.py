@@ -2,8 +2,9 @@ import gaphas
 import pytest
 
 from gaphor.core.eventmanager import EventManager
-from gaphor.core.modeling import ElementFactory, Presentation, StyleSheet
+from gaphor.core.modeling import Comment, ElementFactory, Presentation, StyleSheet
 from gaphor.core.modeling.diagram import Diagram, StyledDiagram, StyledItem
+from gaphor.diagram.selection import Selection
 
 
 @pytest.fixture
@@ -52,3 +53,88 @@ def test_style_sheet_has_default_style():
     style_sheet = StyleSheet()
 
     assert "diagram {" in style_sheet.styleSheet
+
+
+@pytest.fixture
+def style_sheet(element_factory):
+    style_sheet = element_factory.create(StyleSheet)
+    style_sheet.styleSheet = "demo { color: red } demo:hover { color: blue }"
+    return style_sheet
+
+
+def test_style_is_cached(diagram, style_sheet):
+    item = diagram.create(DemoItem)
+
+    style = diagram.style(StyledItem(item))
+
+    assert style["color"] == (1, 0, 0, 1)
+    assert diagram.style(StyledItem(item)) is style
+
+
+def test_style_cache_is_cleared_when_style_sheet_changes(diagram, style_sheet):
+    item = diagram.create(DemoItem)
+    diagram.style(StyledItem(item))
+
+    style_sheet.styleSheet = "demo { color: green }"
+
+    assert diagram.style(StyledItem(item))["color"] == (0, 0.5019607843137255, 0, 1)
+
+
+def test_style_cache_is_cleared_when_model_changes(diagram, style_sheet):
+    style_sheet.styleSheet = "demo[diagram.name=foo] { color: green }"
+    item = diagram.create(DemoItem)
+    diagram.style(StyledItem(item))
+
+    diagram.name = "foo"
+
+    assert diagram.style(StyledItem(item))["color"] == (0, 0.5019607843137255, 0, 1)
+
+
+def test_style_cache_is_cleared_when_subject_changes(
+    diagram, style_sheet, element_factory
+):
+    style_sheet.styleSheet = "demo[subject.body=foo] { color: green }"
+    subject = element_factory.create(Comment)
+    item = diagram.create(DemoItem, subject=subject)
+    diagram.style(StyledItem(item))
+
+    subject.body = "foo"
+
+    assert diagram.style(StyledItem(item))["color"] == (0, 0.5019607843137255, 0, 1)
+
+
+def test_style_cache_is_cleared_when_element_on_attribute_path_changes(
+    diagram, style_sheet, element_factory
+):
+    style_sheet.styleSheet = "demo[subject.annotatedElement.name=foo] { color: green }"
+    other_diagram = element_factory.create(Diagram)
+    subject = element_factory.create(Comment)
+    subject.annotatedElement = other_diagram
+    item = diagram.create(DemoItem, subject=subject)
+    diagram.style(StyledItem(item))
+
+    other_diagram.name = "foo"
+
+    assert diagram.style(StyledItem(item))["color"] == (0, 0.5019607843137255, 0, 1)
+
+
+def test_style_cache_depends_on_item_state(diagram, style_sheet):
+    item = diagram.create(DemoItem)
+    selection = Selection()
+    diagram.style(StyledItem(item, selection))
+
+    selection.hovered_item = item
+
+    assert diagram.style(StyledItem(item, selection))["color"] == (0, 0, 1, 1)
+
+
+def test_style_cache_depends_on_state_of_parent(diagram, style_sheet):
+    style_sheet.styleSheet = ":hover > demo { color: blue }"
+    parent = diagram.create(DemoItem)
+    item = diagram.create(DemoItem, parent=parent)
+    selection = Selection()
+    diagram.style(StyledItem(item, selection))
+
+    selection.hovered_item = parent
+
+    assert diagram.style(StyledItem(item, selection))["color"] == (0, 0, 1, 1)
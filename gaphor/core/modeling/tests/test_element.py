@@ -1,6 +1,7 @@
 import pytest
 
 from gaphor.core.modeling.element import Element
+from gaphor.core.modeling.properties import association, attribute
 
 
 def test_element_note():
@@ -15,3 +16,47 @@ def test_element_can_not_set_random_property():
 
     with pytest.raises(AttributeError):
         e.random_property = 1
+
+
+def test_umlproperties_are_looked_up_once():
+    assert Element.umlproperties() is Element.umlproperties()
+    assert Element.note in Element.umlproperties()
+
+
+def test_umlproperties_with_property_added_later():
+    class A(Element):
+        pass
+
+    A.umlproperties()
+    A.name = attribute("name", str)
+
+    assert A.name in A.umlproperties()
+
+
+def test_umlproperties_with_property_replaced():
+    class A(Element):
+        name = attribute("name", str)
+
+    A.umlproperties()
+    A.name = attribute("name", int)
+
+    assert A.name in A.umlproperties()
+
+
+def test_umlproperties_with_association_stub():
+    class A(Element):
+        pass
+
+    class B(Element):
+        pass
+
+    A.one = association("one", B, upper=1)
+    a = A()
+    b = B()
+    properties = B.umlproperties()
+
+    a.one = b
+
+    assert A.one.stub
+    assert A.one.stub not in properties
+    assert A.one.stub in B.umlproperties()
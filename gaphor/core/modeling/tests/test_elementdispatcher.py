@@ -132,6 +132,27 @@ def test_register_handler_twice(
     assert len(event.events) == 1
 
 
+def test_paths_are_parsed_once_per_type(
+    dispatcher, element_factory, uml_class, event, monkeypatch
+):
+    parsed = []
+    path_to_properties = dispatcher._path_to_properties
+
+    def counting_path_to_properties(element, path):
+        parsed.append(path)
+        return path_to_properties(element, path)
+
+    monkeypatch.setattr(dispatcher, "_path_to_properties", counting_path_to_properties)
+    other_class = element_factory.create(UML.Class)
+
+    dispatcher.subscribe(event.handler, uml_class, "ownedOperation.name")
+    dispatcher.subscribe(event.handler, other_class, "ownedOperation.name")
+
+    assert parsed == ["ownedOperation.name"]
+    assert (uml_class, UML.Class.ownedOperation) in dispatcher._handlers
+    assert (other_class, UML.Class.ownedOperation) in dispatcher._handlers
+
+
 def test_unregister_handler(dispatcher, uml_class, uml_operation, uml_parameter, event):
     # First some setup:
     element = uml_class
@@ -152,6 +173,19 @@ def test_unregister_handler(dispatcher, uml_class, uml_operation, uml_parameter,
     dispatcher.unsubscribe(event.handler)
 
 
+def test_handlers_are_removed_on_flush(
+    element_factory, dispatcher, uml_class, uml_operation, event
+):
+    uml_class.ownedOperation = uml_operation
+    dispatcher.subscribe(event.handler, uml_class, "ownedOperation.name")
+
+    element_factory.flush()
+
+    assert len(dispatcher._handlers) == 0, dispatcher._handlers
+    assert len(dispatcher._reverse) == 0, dispatcher._reverse
+    dispatcher.unsubscribe(event.handler)
+
+
 def test_notification(
     dispatcher, uml_class, uml_operation, uml_parameter, event, element_factory
 ):
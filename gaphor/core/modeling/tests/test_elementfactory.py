@@ -7,12 +7,13 @@ from gaphor.core import event_handler
 from gaphor.core.modeling.event import (
     ElementCreated,
     ElementDeleted,
+    ElementUpdated,
     ModelFlushed,
     ModelReady,
     ServiceEvent,
 )
 from gaphor.core.modeling.presentation import Presentation
-from gaphor.UML import Operation, Parameter
+from gaphor.UML import Class, Classifier, Operation, Parameter, UseCase
 
 
 def test_element_factory_is_an_iterable(element_factory):
@@ -45,6 +46,126 @@ def test_should_not_create_presentation_elements(element_factory):
         element_factory.create(Presentation)
 
 
+def test_select_by_type(element_factory):
+    c1 = element_factory.create(Class)
+    element_factory.create(Parameter)
+    u = element_factory.create(UseCase)
+    c2 = element_factory.create(Class)
+
+    assert element_factory.lselect(Class) == [c1, c2]
+    assert element_factory.lselect(Classifier) == [c1, u, c2]
+    assert element_factory.lselect(Operation) == []
+
+
+def test_select_by_type_after_unlink(element_factory):
+    c1 = element_factory.create(Class)
+    u = element_factory.create(UseCase)
+    c2 = element_factory.create(Class)
+
+    assert element_factory.lselect(Classifier) == [c1, u, c2]
+
+    c1.unlink()
+
+    assert element_factory.lselect(Class) == [c2]
+    assert element_factory.lselect(Classifier) == [u, c2]
+
+
+def test_select_by_type_after_class_change(element_factory):
+    c1 = element_factory.create(Class)
+    u = element_factory.create(UseCase)
+    c2 = element_factory.create(Class)
+
+    u.__class__ = Class
+    element_factory.reindex(u)
+
+    assert element_factory.lselect(Class) == [c1, u, c2]
+    assert element_factory.lselect(UseCase) == []
+
+
+def test_create_lazy(element_factory):
+    loaded = []
+
+    def load(element):
+        loaded.append(element)
+        element.name = "Lazy"
+
+    c = element_factory.create_lazy(Class, "lazy-id", load)
+
+    assert c.id == "lazy-id"
+    assert element_factory.lookup("lazy-id") is c
+    assert element_factory.lselect(Class) == [c]
+    assert isinstance(c, Class)
+    assert not loaded
+
+    assert c.name == "Lazy"
+    assert type(c) is Class
+    assert loaded == [c]
+
+
+def test_lazy_element_is_loaded_once(element_factory):
+    loaded = []
+    c = element_factory.create_lazy(Class, "lazy-id", loaded.append)
+
+    c.name = "Changed"
+
+    assert c.name == "Changed"
+    assert loaded == [c]
+
+
+def test_lazy_element_loads_without_events(event_manager, element_factory):
+    operation = element_factory.create(Operation)
+
+    def load(element):
+        element.name = "Lazy"
+        element.ownedOperation = operation
+
+    lazy = element_factory.create_lazy(Class, "lazy-id", load)
+    updates = []
+
+    @event_handler(ElementUpdated)
+    def on_element_updated(event):
+        updates.append(event)
+
+    event_manager.subscribe(on_element_updated)
+
+    assert lazy.ownedOperation[0] is operation
+    assert operation.owner is lazy
+    assert updates == []
+
+
+def test_lazy_elements_are_post_loaded_once_loaded(element_factory, monkeypatch):
+    postloaded = []
+    monkeypatch.setattr(Class, "postload", lambda self: postloaded.append(self))
+
+    b = element_factory.create_lazy(Class, "b", lambda e: None)
+    a = element_factory.create_lazy(Class, "a", lambda e: b.name)
+    assert a.name is None
+
+    assert postloaded == [b, a]
+
+
+def test_materialize_lazy_element(element_factory):
+    loaded = []
+    c = element_factory.create_lazy(Class, "lazy-id", loaded.append)
+
+    element_factory.materialize(c)
+    element_factory.materialize(c)
+
+    assert type(c) is Class
+    assert loaded == [c]
+
+
+def test_flush_lazy_elements(element_factory):
+    loaded = []
+    element_factory.create(Class)
+    element_factory.create_lazy(Class, "lazy-id", loaded.append)
+
+    element_factory.flush()
+
+    assert element_factory.size() == 0
+    assert not loaded
+
+
 def test_flush(element_factory):
     p = element_factory.create(Parameter)
     assert len(list(element_factory.values())) == 1
@@ -56,6 +177,21 @@ def test_flush(element_factory):
     assert not list(element_factory.values()), list(element_factory.values())
 
 
+def test_flush_drops_references(element_factory):
+    c = element_factory.create(Class)
+    o = element_factory.create(Operation)
+    c.name = "Name"
+    c.ownedOperation = o
+
+    element_factory.flush()
+
+    assert c.name is None
+    assert not c.ownedOperation
+    assert o.owner is None
+    assert o not in element_factory
+    assert element_factory.lselect(Class) == []
+
+
 def test_without_application(element_factory):
     element_factory.create(Parameter)
     assert element_factory.size() == 1, element_factory.size()
@@ -303,6 +303,61 @@ def test_association_swap():
     assert a.one[1] is b1
 
 
+def test_association_remove_keeps_order():
+    class A(Element):
+        many: relation_many[B]
+
+    class B(Element):
+        pass
+
+    A.many = association("many", B, 0, "*")
+
+    a = A()
+    bs = [B() for _ in range(5)]
+    for b in bs:
+        a.many = b
+
+    del a.many[bs[2]]
+    a.many.remove(bs[0])
+
+    assert bs[2] not in a.many
+    assert list(a.many) == [bs[1], bs[3], bs[4]]
+    assert a.many[:][0] is bs[1]
+
+
+def test_association_load_without_notification():
+    class A(Element):
+        one: relation_one[B]
+        u: relation_many[B]
+
+    class B(Element):
+        many: relation_many[A]
+
+    A.one = association("one", B, upper=1, opposite="many")
+    B.many = association("many", A, opposite="one")
+    A.u = derivedunion("u", B, 0, "*", A.one)
+
+    events = []
+
+    class EventA(A):
+        def handle(self, event):
+            events.append(event)
+
+    a = EventA()
+    b = B()
+    assert not a.u
+
+    A.one.load(a, b, do_notify=False)
+
+    assert a.one is b
+    assert a in b.many
+    assert not events
+
+    A.u.invalidate_all()
+
+    assert list(a.u) == [b]
+
+
 def test_association_unlink_1():
     class A(Element):
         one: relation_many[B]
@@ -552,6 +607,50 @@ def test_derivedunion():
     assert d in a.u
 
 
+def test_derivedunion_is_only_updated_for_changed_element():
+    class A(Element):
+        a: relation_many[A]
+        u: relation_many[A]
+
+    A.a = association("a", A)
+    A.u = derivedunion("u", A, 0, "*", A.a)
+
+    a1 = A()
+    a2 = A()
+    a1.a = A()
+    a2.a = A()
+    u1 = a1.u
+    u2 = a2.u
+
+    a1.a = A()
+
+    assert A.u.local
+    assert a1.u is not u1
+    assert len(a1.u) == 2
+    assert a2.u is u2
+
+
+def test_derivedunion_of_derived_property_is_updated_for_all_elements():
+    class A(Element):
+        a: relation_many[A]
+        d: relation_many[A]
+        u: relation_many[A]
+
+    A.a = association("a", A)
+    A.d = derived("d", A, 0, "*", lambda self: self.a, A.a)
+    A.u = derivedunion("u", A, 0, "*", A.d)
+
+    a1 = A()
+    a2 = A()
+    u2 = a2.u
+
+    a1.a = A()
+
+    assert not A.u.local
+    assert len(a1.u) == 1
+    assert a2.u is not u2
+
+
 def test_derivedunion_notify_for_single_derived_property():
     class A(Element):
         pass
@@ -84,3 +84,26 @@ def test_mixed_case_attributes(diagram, element_factory):
 
     assert node.attribute("ownedattribute") == "property"
     assert node.attribute("ownedattribute.name") == "first"
+
+
+def test_attribute_name_is_normalized(diagram, element_factory):
+    class_ = element_factory.create(UML.Class)
+    classitem = diagram.create(ClassItem, subject=class_)
+    class_.isAbstract = True
+
+    node = StyledItem(classitem)
+
+    assert node.attribute("isabstract") == "true"
+
+
+def test_attribute_value_is_remembered_while_matching(diagram, element_factory):
+    class_ = element_factory.create(UML.Class)
+    classitem = diagram.create(ClassItem, subject=class_)
+    class_.name = "myname"
+    node = StyledItem(classitem)
+
+    assert node.attribute("name") == "myname"
+    class_.name = "othername"
+
+    assert node.attribute("name") == "myname"
+    assert StyledItem(classitem).attribute("name") == "othername"
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import operator
-from typing import Iterator, Protocol, Sequence, TypedDict, Union
+from typing import Callable, Iterator, Protocol, Sequence, TypedDict, Union
 
 from gaphor.core.styling.compiler import compile_style_sheet
 from gaphor.core.styling.declarations import (
@@ -125,16 +125,66 @@ class CompiledStyleSheet:
             if selspec != "error"
         ]
 
+        # Most selectors match on an element name. Only those selectors,
+        # and the selectors without name, have to be tested for a node.
+        selectors_by_name: dict[str | None, list] = {}
+        for selector, specificity, order, declarations in self.selectors:
+            selectors_by_name.setdefault(selector.lower_local_name, []).append(
+                (selector.test, specificity, order, declarations)
+            )
+        self._universal_selectors = selectors_by_name.pop(None, [])
+        self._selectors_by_name = selectors_by_name
+
     def match(self, node: StyleNode) -> Style:
         results = sorted(
             (
                 (specificity, order, declarations)
-                for pred, specificity, order, declarations in self.selectors
+                for selectors in (
+                    self._universal_selectors,
+                    self._selectors_by_name.get(node.name(), ()),
+                )
+                for pred, specificity, order, declarations in selectors
                 if pred(node)
             ),
             key=MATCH_SORT_KEY,
         )
         return merge_styles(*(decl for _, _, decl in results))  # type: ignore[arg-type]
 
+    def changed_selectors(
+        self, previous: CompiledStyleSheet
+    ) -> list[Callable[[StyleNode], bool]] | None:
+        """Selectors of rules that differ from a previous style sheet.
+
+        Only nodes matched by one of those selectors (from either style
+        sheet) can be styled differently. If the rules both style sheets
+        have in common are in a different order, any node can be affected,
+        and ``None`` is returned.
+        """
+        old_rules = [
+            (_rule_key(selector, declarations), selector)
+            for selector, _, _, declarations in previous.selectors
+        ]
+        new_rules = [
+            (_rule_key(selector, declarations), selector)
+            for selector, _, _, declarations in self.selectors
+        ]
+        common = {key for key, _ in old_rules}.intersection(key for key, _ in new_rules)
+
+        if [key for key, _ in old_rules if key in common] != [
+            key for key, _ in new_rules if key in common
+        ]:
+            return None
+
+        return [
+            selector
+            for rules in (old_rules, new_rules)
+            for key, selector in rules
+            if key not in common
+        ]
+
+
+def _rule_key(selector, declarations) -> tuple[str, str]:
+    return selector.text, repr(declarations)
+
 
 MATCH_SORT_KEY = operator.itemgetter(0, 1)
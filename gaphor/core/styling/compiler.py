@@ -6,7 +6,8 @@ Ayoub.
 
 import re
 from functools import singledispatch
-from typing import Callable, Dict, Iterator, Literal, Tuple, Union
+from itertools import count
+from typing import Callable, Dict, Iterator, List, Literal, Optional, Tuple, Union
 
 import tinycss2
 
@@ -17,8 +18,34 @@ from gaphor.core.styling.declarations import parse_declarations
 split_whitespace = re.compile("[^ \t\r\n\f]+").findall
 
 
+class CompiledSelector:
+    """A compiled selector.
+
+    Call the selector with an element to test if it matches. If the
+    selector only matches elements with a specific name, that name is
+    provided as `lower_local_name`. This allows selectors to be indexed.
+    The normalized selector is kept as `text`, so compiled rules can be
+    compared.
+    """
+
+    __slots__ = ("test", "lower_local_name", "text")
+
+    def __init__(
+        self,
+        test: Callable[[object], bool],
+        lower_local_name: Optional[str] = None,
+        text: str = "",
+    ):
+        self.test = test
+        self.lower_local_name = lower_local_name
+        self.text = text
+
+    def __call__(self, el) -> bool:
+        return self.test(el)
+
+
 Rule = Union[
-    Tuple[Tuple[Callable[[object], bool], Tuple[int, int, int]], Dict[str, object]],
+    Tuple[Tuple[CompiledSelector, Tuple[int, int, int]], Dict[str, object]],
     Tuple[Literal["error"], Union[tinycss2.ast.ParseError, selectors.SelectorError]],
 ]
 
@@ -46,8 +73,12 @@ def compile_rules(rules):
             if not media_selector:
                 continue
             media_query = compile_node(media_selector)
+            media_text = f"@media {media_selector!r}"
             yield from (
-                ((_combine(media_query, selspec[0]), selspec[1]), declaration)
+                (
+                    (_combine(media_query, media_text, selspec[0]), selspec[1]),
+                    declaration,
+                )
                 for selspec, declaration in compile_rules(at_rules)
                 if selspec != "error"
             )
@@ -70,8 +101,13 @@ def compile_rules(rules):
         yield from ((selector, declaration) for selector in selector_list)
 
 
-def _combine(a, b):
-    return lambda el: a(el) and b(el)
+def _combine(media_query, media_text, selector):
+    test = selector.test
+    return CompiledSelector(
+        lambda el: media_query(el) and test(el),
+        selector.lower_local_name,
+        f"{media_text} {{ {selector.text} }}",
+    )
 
 
 def compile_selector_list(input):
@@ -81,12 +117,196 @@ def compile_selector_list(input):
 
     Returns a list of compiled selectors.
     """
+    parsed_selectors = list(selectors.selectors(input))
+    tests = compile_selectors(parsed_selectors)
     return [
-        (compile_node(selector), selector.specificity)
-        for selector in selectors.selectors(input)
+        (
+            CompiledSelector(test, lower_local_name(selector), repr(selector)),
+            selector.specificity,
+        )
+        for selector, test in zip(parsed_selectors, tests)
     ]
 
 
+def lower_local_name(selector) -> Optional[str]:
+    """The element name a selector matches, if any.
+
+    The name is taken from the right-most compound selector, like
+    cssselect2's `CompiledSelector` does.
+    """
+    if isinstance(selector, selectors.CombinedSelector):
+        selector = selector.right
+    return next(
+        (
+            simple_selector.lower_local_name
+            for simple_selector in selector.simple_selectors
+            if isinstance(simple_selector, selectors.LocalNameSelector)
+        ),
+        None,
+    )
+
+
+def compile_selectors(parsed_selectors) -> List[Callable[[object], bool]]:
+    """Compile parsed selectors to Python functions.
+
+    Like cssselect2, selectors are translated to Python source code,
+    which is compiled in one go. The generated functions test an element
+    with plain loops instead of generators, and call ``el.name()`` and
+    ``el.parent()`` only once per element.
+
+    `compile_node()` is the reference implementation, based on closures.
+    """
+    generator = _SourceGenerator()
+    names = [generator.function(selector) for selector in parsed_selectors]
+    namespace = {"split_whitespace": split_whitespace}
+    exec(compile(generator.source(), "<selectors>", "exec"), namespace)
+    return [namespace[name] for name in names]
+
+
+class _SourceGenerator:
+    def __init__(self):
+        self._functions: List[str] = []
+        self._counter = count()
+
+    def source(self) -> str:
+        return "\n\n".join(self._functions)
+
+    def _name(self, prefix):
+        return f"_{prefix}{next(self._counter)}"
+
+    def _add_function(self, name, lines):
+        self._functions.append(
+            "\n".join((f"def {name}(el):", *(f"    {line}" for line in lines)))
+        )
+
+    def function(self, selector) -> str:
+        """Add a function that tests the selector; return its name."""
+        name = self._name("selector")
+        self._add_function(name, [*self.statements(selector, "el"), "return True"])
+        return name
+
+    def statements(self, selector, var) -> List[str]:
+        """Statements that return False if the element in `var` does not
+        match."""
+        if not isinstance(selector, selectors.CombinedSelector):
+            expression = self.expression(selector, var)
+            if expression == "True":
+                return []
+            return [f"if not ({expression}):", "    return False"]
+
+        lines = self.statements(selector.right, var)
+        parent = self._name("parent")
+        if selector.combinator == ">":
+            return [
+                *lines,
+                f"{parent} = {var}.parent()",
+                f"if {parent} is None:",
+                "    return False",
+                *self.statements(selector.left, parent),
+            ]
+        elif selector.combinator == " ":
+            return [
+                *lines,
+                f"{parent} = {var}.parent()",
+                f"while {parent}:",
+                f"    if {self.test(selector.left, parent)}:",
+                "        break",
+                f"    {parent} = {parent}.parent()",
+                "else:",
+                "    return False",
+            ]
+        raise selectors.SelectorError("Unknown combinator", selector.combinator)
+
+    def test(self, selector, var) -> str:
+        """An expression testing a (possibly combined) selector."""
+        if isinstance(selector, selectors.CombinedSelector):
+            return f"{self.function(selector)}({var})"
+        return self.expression(selector, var)
+
+    def expression(self, selector, var) -> str:
+        """An expression testing a compound or simple selector."""
+        if isinstance(selector, selectors.CompoundSelector):
+            return (
+                " and ".join(
+                    f"({self.expression(sel, var)})"
+                    for sel in selector.simple_selectors
+                )
+                or "True"
+            )
+        elif isinstance(selector, selectors.LocalNameSelector):
+            return f"{var}.name() == {selector.lower_local_name!r}"
+        elif isinstance(selector, selectors.AttributeSelector):
+            return self.attribute_expression(selector, var)
+        elif isinstance(selector, selectors.PseudoClassSelector):
+            if selector.name == "empty":
+                return f"not next({var}.children(), 0)"
+            elif selector.name in (
+                "root",
+                "hover",
+                "focus",
+                "active",
+                "drop",
+                "disabled",
+            ):
+                return f"{selector.name!r} in {var}.state()"
+            raise selectors.SelectorError("Unknown pseudo-class", selector.name)
+        elif isinstance(selector, selectors.FunctionalPseudoClassSelector):
+            return self.functional_pseudo_class_expression(selector, var)
+        raise selectors.SelectorError("Unknown selector", selector)
+
+    def attribute_expression(self, selector, var) -> str:
+        attribute = f"{var}.attribute({selector.lower_name!r})"
+        operator = selector.operator
+        value = selector.value and selector.value.lower()
+
+        if operator is None:
+            return attribute
+        elif operator == "=":
+            return f"{attribute} == {value!r}"
+        elif operator == "~=":
+            return f"{value!r} in split_whitespace({attribute})"
+        elif operator == "^=":
+            return f"{attribute}.startswith({value!r})" if value else "False"
+        elif operator == "$=":
+            return f"{attribute}.endswith({value!r})" if value else "False"
+        elif operator == "*=":
+            return f"{value!r} in {attribute}" if value else "False"
+        elif operator == "|=":
+            v = self._name("value")
+            return (
+                f"({v} := {attribute}) == {value!r} or {v}.startswith({value + '-'!r})"
+            )
+        raise selectors.SelectorError("Unknown attribute operator", operator)
+
+    def functional_pseudo_class_expression(self, selector, var) -> str:
+        name = selector.name
+        if name not in ("has", "is", "not"):
+            raise selectors.SelectorError("Unknown pseudo-class", name)
+
+        sub_selectors = list(selectors.selectors(selector.arguments))
+        if name == "has":
+            function = self._name("has")
+            tests = " or ".join(f"({self.test(sel, 'child')})" for sel in sub_selectors)
+            self._add_function(
+                function,
+                [
+                    "stack = [*el.children()]",
+                    "while stack:",
+                    "    child = stack.pop()",
+                    f"    if {tests}:",
+                    "        return True",
+                    "    stack.extend(child.children())",
+                    "return False",
+                ],
+            )
+            expression = f"{function}({var})"
+        else:
+            tests = " or ".join(f"({self.test(sel, var)})" for sel in sub_selectors)
+            expression = tests if name == "is" else f"not ({tests})"
+        selector.specificity = max(sel.specificity for sel in sub_selectors)
+        return expression
+
+
 @singledispatch
 def compile_node(selector):
     """Dynamic dispatch selector nodes.
@@ -209,13 +429,12 @@ def compile_functional_pseudo_class_selector(
     if name not in ("has", "is", "not"):
         raise selectors.SelectorError("Unknown pseudo-class", name)
 
-    sub_selectors = compile_selector_list(selector.arguments)
-    selector.specificity = max(spec for _, spec in sub_selectors)
+    sub_selectors = list(selectors.selectors(selector.arguments))
+    tests = [compile_node(sel) for sel in sub_selectors]
+    selector.specificity = max(sel.specificity for sel in sub_selectors)
     if name == "has":
-        return lambda el: any(
-            any(sel(c) for sel, _ in sub_selectors) for c in descendants(el)
-        )
+        return lambda el: any(any(test(c) for test in tests) for c in descendants(el))
     elif name == "is":
-        return lambda el: any(sel(el) for sel, _ in sub_selectors)
+        return lambda el: any(test(el) for test in tests)
     elif name == "not":
-        return lambda el: not any(sel(el) for sel, _ in sub_selectors)
+        return lambda el: not any(test(el) for test in tests)
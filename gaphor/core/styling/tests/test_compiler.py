@@ -1,6 +1,7 @@
 import pytest
 
-from gaphor.core.styling import compile_style_sheet
+from gaphor.core.styling import compile_style_sheet, selectors
+from gaphor.core.styling.compiler import compile_node, compile_selectors
 from gaphor.core.styling.selectors import SelectorError
 
 
@@ -341,3 +342,92 @@ def test_media_query(css):
 def test_invalid_media_query(css, exc_type):
     with pytest.raises(exc_type):
         next(compile_style_sheet(css))
+
+
+EQUIVALENCE_SELECTORS = [
+    "*",
+    ":empty",
+    "ClassItem[MixedCase]",
+    "classitem > nested",
+    "classitem nested",
+    "classitem",
+    "classitem:has(middle > nested)",
+    "classitem:has(nested)",
+    "classitem:is(:hover, :active)",
+    "classitem:not(:hover)",
+    "classitem[subject$=foo]",
+    "classitem[subject*=foo]",
+    "classitem[subject.members]",
+    "classitem[subject=foo]",
+    "classitem[subject]",
+    "classitem[subject^=foo]",
+    "classitem[subject|=foo]",
+    "classitem[subject~=foo]",
+    "classitem[subject^='']",
+    "node:empty",
+    "node:has(:is(:hover))",
+    ":hover",
+    ":focus",
+    ":active",
+    ":drop",
+    ":disabled",
+    "classitem middle > nested",
+    "classitem > middle nested",
+    "diagram classitem nested:not(middle *)",
+    "*:has(classitem nested, :empty)",
+    "dependency[on_folded_interface = true]",
+]
+
+
+def equivalence_nodes():
+    def tree(subject, state):
+        return Node(
+            "diagram",
+            children=[
+                Node(
+                    "classitem",
+                    attributes={
+                        "subject": subject,
+                        "subject.members": subject,
+                        "mixedcase": "yes",
+                    },
+                    state=state,
+                    children=[
+                        Node("middle", children=[Node("nested", state=("hover",))]),
+                        Node("nested", attributes={"subject": subject}),
+                    ],
+                ),
+                Node("dependency", attributes={"on_folded_interface": "true"}),
+                Node("node", children=[Node("leaf", state=state)]),
+                Node("node"),
+            ],
+        )
+
+    for subject, state in [
+        ("foo", ()),
+        ("foo-bar", ("hover",)),
+        ("bar foo", ("active", "focus")),
+        ("foobar", ("drop",)),
+        ("", ("disabled",)),
+    ]:
+        yield from descendants_and_self(tree(subject, state))
+
+
+def descendants_and_self(node):
+    yield node
+    for child in node.children():
+        yield from descendants_and_self(child)
+
+
+@pytest.mark.parametrize("css", EQUIVALENCE_SELECTORS)
+def test_generated_code_is_equivalent_to_compiled_nodes(css):
+    (selector,) = selectors.selectors(css)
+    (generated,) = compile_selectors([selector])
+    compiled = compile_node(selector)
+
+    results = [
+        (bool(generated(node)), bool(compiled(node))) for node in equivalence_nodes()
+    ]
+
+    assert all(generated == compiled for generated, compiled in results), results
+    assert any(generated for generated, _ in results) or "''" in css
@@ -1,6 +1,6 @@
 import pytest
 
-from gaphor.core.styling import CompiledStyleSheet, compile_style_sheet
+from gaphor.core.styling import CompiledStyleSheet, compile_style_sheet, merge_styles
 from gaphor.core.styling.tests.test_compiler import Node
 
 
@@ -336,3 +336,110 @@ def test_color_schemes():
     assert normal_props.get("line-width") == 1.0
     assert dark_props.get("line-width") == 2.0
     assert light_props.get("line-width") == 3.0
+
+
+def large_style_sheet(names):
+    rules = ["* { line-width: 1 }", ":hover { line-width: 2 }"]
+    for n, name in enumerate(names):
+        rules.extend(
+            (
+                f"{name} {{ font-size: {n} }}",
+                f"{name}[subject] {{ line-width: {n} }}",
+                f"diagram > {name} {{ min-width: {n} }}",
+                f"{name} > * {{ min-height: {n} }}",
+                f":is({name}) {{ padding: {n} }}",
+                f"@media dark-mode {{ {name} {{ opacity: 0.{n} }} }}",
+            )
+        )
+    return "\n".join(rules)
+
+
+def test_match_large_style_sheet():
+    names = [f"type{n}" for n in range(100)]
+    compiled_style_sheet = CompiledStyleSheet(large_style_sheet(names))
+    diagram = Node("diagram")
+    nodes = [
+        Node(
+            name,
+            parent=diagram,
+            children=[Node("child")],
+            attributes={"subject": "yes"} if n % 2 else {},
+            state=("hover",) if n % 3 else (),
+            dark_mode=bool(n % 5),
+        )
+        for n, name in enumerate(names)
+    ]
+
+    for node in [*nodes, *(node._children[0] for node in nodes)]:
+        # Match without selector index
+        expected = [
+            declarations
+            for _, _, declarations in sorted(
+                (
+                    (specificity, order, declarations)
+                    for pred, specificity, order, declarations in (
+                        compiled_style_sheet.selectors
+                    )
+                    if pred(node)
+                ),
+                key=lambda r: r[:2],
+            )
+        ]
+
+        assert compiled_style_sheet.match(node) == merge_styles(*expected)
+
+
+def changed_names(css, previous_css):
+    changed_selectors = CompiledStyleSheet(css).changed_selectors(
+        CompiledStyleSheet(previous_css)
+    )
+    if changed_selectors is None:
+        return None
+    nodes = [
+        Node(name, dark_mode=dark_mode)
+        for name in ("class", "component", "package")
+        for dark_mode in (False, True)
+    ]
+    return {
+        node.name()
+        for node in nodes
+        for selector in changed_selectors
+        if selector(node)
+    }
+
+
+def test_changed_selectors_for_same_style_sheet():
+    css = "class { color: red } component { color: blue }"
+
+    assert changed_names(css, css) == set()
+
+
+def test_changed_selectors_for_changed_declaration():
+    assert changed_names(
+        "class { color: red } component { color: green }",
+        "class { color: red } component { color: blue }",
+    ) == {"component"}
+
+
+def test_changed_selectors_for_added_and_removed_rules():
+    assert changed_names(
+        "class { color: red } package { color: green }",
+        "class { color: red } component { color: blue }",
+    ) == {"component", "package"}
+
+
+def test_changed_selectors_in_media_query():
+    assert changed_names(
+        "@media dark-mode { class { color: red } }",
+        "@media light-mode { class { color: red } }",
+    ) == {"class"}
+
+
+def test_changed_selectors_when_rules_are_reordered():
+    assert (
+        changed_names(
+            "component { color: blue } class { color: red }",
+            "class { color: red } component { color: blue }",
+        )
+        is None
+    )
@@ -75,9 +75,10 @@ class ModelLoaded:
 
 
 class ModelSaved:
-    def __init__(self, service, filename: Path | None = None):
+    def __init__(self, service, filename: Path | None = None, modified: bool = False):
         self.service = service
         self.filename = filename
+        self.modified = modified
 
 
 class TransactionBegin:
@@ -1,8 +1,9 @@
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Optional
 
 from gaphor.abc import ActionProvider, ModelingLanguage, Service
 from gaphor.action import action
 from gaphor.core import event_handler
+from gaphor.core.modeling import Element
 from gaphor.entrypoint import initialize
 from gaphor.services.properties import PropertyChanged
 
@@ -30,6 +31,7 @@ class ModelingLanguageService(Service, ActionProvider, ModelingLanguage):
         self._modeling_languages: Dict[str, ModelingLanguage] = initialize(
             "gaphor.modelinglanguages"
         )
+        self._element_types: Dict[str, Optional[type[Element]]] = {}
         if event_manager:
             self.event_manager.subscribe(self.on_property_changed)
 
@@ -68,16 +70,22 @@ class ModelingLanguageService(Service, ActionProvider, ModelingLanguage):
         return self._modeling_language().diagram_types
 
     def lookup_element(self, name):
-        return next(
-            filter(
+        # Element types are looked up for every element loaded:
+        # remember the outcome, also if the type does not exist.
+        try:
+            return self._element_types[name]
+        except KeyError:
+            element_type = self._element_types[name] = next(
+                filter(
+                    None,
+                    (
+                        provider.lookup_element(name)
+                        for provider in self._modeling_languages.values()
+                    ),
+                ),
                 None,
-                [
-                    provider.lookup_element(name)
-                    for provider in self._modeling_languages.values()
-                ],
-            ),
-            None,
-        )
+            )
+            return element_type
 
     @action(name="select-modeling-language")
     def select_modeling_language(self, modeling_language: str):
@@ -23,3 +23,15 @@ def test_lookup_sysml_element(modeling_language):
 
 def test_lookup_c4model_element(modeling_language):
     assert modeling_language.lookup_element("C4Database")
+
+
+def test_lookup_element_is_cached(modeling_language):
+    assert modeling_language.lookup_element(
+        "Class"
+    ) is modeling_language.lookup_element("Class")
+    assert "Class" in modeling_language._element_types
+
+
+def test_lookup_non_existent_element(modeling_language):
+    assert modeling_language.lookup_element("NonExistent") is None
+    assert modeling_language._element_types["NonExistent"] is None
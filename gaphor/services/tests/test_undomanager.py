@@ -239,6 +239,32 @@ def test_element_factory_undo(element_factory, undo_manager):
     assert element_factory.lookup(p.id)
 
 
+def test_undo_stack_is_cleared_on_flush(element_factory, undo_manager):
+    for _ in range(2):
+        undo_manager.begin_transaction()
+        element_factory.create(Element)
+        undo_manager.commit_transaction()
+    undo_manager.undo_transaction()
+    assert undo_manager.can_undo()
+    assert undo_manager.can_redo()
+
+    element_factory.flush()
+
+    assert not undo_manager.can_undo()
+    assert not undo_manager.can_redo()
+
+
+def test_open_transaction_is_discarded_on_flush(element_factory, undo_manager):
+    undo_manager.begin_transaction()
+    element_factory.create(Element)
+
+    element_factory.flush()
+    undo_manager.begin_transaction()
+    undo_manager.commit_transaction()
+
+    assert not undo_manager.can_undo()
+
+
 def test_element_factory_rollback(element_factory, undo_manager):
     undo_manager.begin_transaction()
     element_factory.create(Element)
@@ -25,6 +25,7 @@ from gaphor.core.modeling.event import (
     AttributeUpdated,
     ElementCreated,
     ElementDeleted,
+    ModelFlushed,
     ModelReady,
     RevertibleEvent,
 )
@@ -120,8 +121,9 @@ class UndoManager(Service, ActionProvider):
     def clear_redo_stack(self):
         del self._redo_stack[:]
 
-    @event_handler(ModelReady)
+    @event_handler(ModelReady, ModelFlushed)
     def reset(self, event=None):
+        # After a flush, undo actions refer to elements that no longer exist
         self.clear_redo_stack()
         self.clear_undo_stack()
         self._action_executed()
@@ -17,21 +17,31 @@ referered to in the dictionary returned by parse().
 
 The generator parse_generator(filename, loader) may be used if the loading
 takes a long time. The yielded values are the percentage of the file read.
+The file is fed to the parser in blocks of `BLOCK_SIZE` characters (or bytes,
+for binary files), so progress is reported once per block.
 """
 
 from __future__ import annotations
 
 import logging
 import os
-from collections import OrderedDict
+import re
+from collections import OrderedDict, defaultdict
+from typing import Iterable, Iterator
 from xml.sax import SAXParseException, handler, make_parser, xmlreader
 
 from gaphor.storage.upgrade_canvasitem import upgrade_canvasitem
 
-__all__ = ["parse", "ParserException"]
+__all__ = ["parse", "ParserException", "ReverseReferences"]
 
 log = logging.getLogger(__name__)
 
+# Amount of data fed to the XML parser at once.
+BLOCK_SIZE = 64 * 1024
+
+MERGE_CONFLICT_MARKER = re.compile(r"^<<<<<", re.MULTILINE)
+MERGE_CONFLICT_MARKER_BYTES = re.compile(rb"^<<<<<", re.MULTILINE)
+
 
 class base:
     """Simple base class for element, and canvas."""
@@ -58,6 +68,14 @@ class base:
         except KeyError:
             return None
 
+    def referenced_ids(self) -> Iterator[str]:
+        """Iterate the ID's of all referenced elements."""
+        for refids in self.references.values():
+            if isinstance(refids, list):
+                yield from refids
+            else:
+                yield refids
+
 
 class element(base):
     def __init__(self, id: str, type: str, canvas: canvas | None = None):
@@ -71,6 +89,32 @@ class canvas(base):
     pass
 
 
+class ReverseReferences:
+    """An index of element ID -> ID's of the elements referring to it.
+
+    The index is built once, for all parsed elements. Elements that are
+    removed from the parsed elements should also be removed from the index.
+    """
+
+    def __init__(self, elements: Iterable[element] = ()):
+        self._referrers: dict[str, set[str]] = defaultdict(set)
+        for elem in elements:
+            self.add(elem)
+
+    def add(self, elem: element) -> None:
+        for refid in elem.referenced_ids():
+            self._referrers[refid].add(elem.id)
+
+    def remove(self, elem: element) -> None:
+        for refid in elem.referenced_ids():
+            if referrers := self._referrers.get(refid):
+                referrers.discard(elem.id)
+
+    def referrers(self, id: str) -> set[str]:
+        """The ID's of the elements that refer to the element with `id`."""
+        return self._referrers.get(id, set())
+
+
 XMLNS = "http://gaphor.sourceforge.net/model"
 
 
@@ -311,27 +355,92 @@ class ErrorHandler:
         log.warning(exception)
 
 
-def parse_generator(file_obj, loader):
+def parse_generator(file_obj, loader, block_size=BLOCK_SIZE):
     """The generator based version of parse().
 
     parses the file and load it with ContentHandler loader. Returns a
     progress percentage.
+
+    The file is read in blocks of `block_size`. Both text and binary file
+    objects are supported.
     """
     assert file_obj.seekable()
     assert isinstance(loader, GaphorLoader), "loader should be a GaphorLoader"
 
     parser = new_parser(loader)
+    yield from _feed(file_obj, parser, block_size)
+
+
+def scan(file_obj, block_size=BLOCK_SIZE) -> tuple[str | None, set[str]]:
+    """Check that a model file can be parsed, without loading it.
+
+    The XML is checked, but no elements are created, so this is a lot
+    faster than `parse()`. Returns the Gaphor version of the file and the
+    types of the elements in the file. The file is read from the current
+    position, and the position is restored afterwards.
+    """
+    position = file_obj.tell()
+    scanner = ModelScanner()
+    parser = new_parser(scanner)
+    for _ in _feed(file_obj, parser, block_size):
+        pass
+
+    file_obj.seek(position)
+    return scanner.gaphor_version, scanner.types
+
+
+class ModelScanner(handler.ContentHandler):
+    """Collect the Gaphor version and element types of a model file."""
+
+    def __init__(self):
+        super().__init__()
+        self.gaphor_version: str | None = None
+        self.types: set[str] = set()
+        self.depth = 0
+
+    def startElementNS(self, name, qname, attrs):
+        if name[0] and name[0] != XMLNS:
+            return
+        if self.depth == 0:
+            if name[1] != "gaphor":
+                raise ParserException(f"Invalid XML: tag <{name[1]}> not known")
+            a = {key[1]: val for key, val in attrs.items()}
+            self.gaphor_version = a.get("gaphor-version") or a.get("gaphor_version")
+        elif self.depth == 1:
+            self.types.add(name[1])
+        self.depth += 1
+
+    def endElementNS(self, name, qname):
+        if not name[0] or name[0] == XMLNS:
+            self.depth -= 1
+
+
+def _feed(file_obj, parser, block_size):
     file_size = get_file_size(file_obj)
     count = 0
-
-    for line in file_obj:
+    # Keep the end of the previous block, so a merge conflict marker
+    # spanning two blocks can still be found
+    tail = None
+    merge_conflict = False
+
+    while block := file_obj.read(block_size):
+        if tail is None:
+            marker = (
+                MERGE_CONFLICT_MARKER_BYTES
+                if isinstance(block, bytes)
+                else MERGE_CONFLICT_MARKER
+            )
+            tail = block[:0]
         try:
-            parser.feed(line)
+            parser.feed(block)
         except SAXParseException as e:
-            if line.startswith("<<<<<"):
+            # The marker may be cut off by the end of the block
+            if merge_conflict or marker.search(tail + block + file_obj.read(8)):
                 raise MergeConflictDetected from e
             raise
-        count += len(line)
+        merge_conflict = merge_conflict or bool(marker.search(tail + block))
+        tail = block[-8:]
+        count += len(block)
         yield (count * 100) / file_size
 
 
@@ -0,0 +1,191 @@
+"""Binary snapshots of parsed model files.
+
+A snapshot contains the parsed elements of a model file (see
+`gaphor.storage.parser`): the id, type, values and references of every
+element. Loading a snapshot is a lot faster than parsing the XML model
+file, which is useful when the same model is loaded over and over again.
+
+A snapshot is stored next to the model file (``model.gaphor.snapshot``) and
+is keyed on the SHA-256 digest of the model file contents. It is only used
+if the digest matches.
+
+The format is versioned. All strings are stored once, in a string table.
+Since XML documents can not contain NUL characters, the strings are
+separated by NUL. The element data is a list of unsigned 32-bit integers
+(little endian) that refer to the string table:
+
+    magic                b"GAPHSNAP"
+    format version       uint32
+    content digest       32 bytes
+    string table length  uint32
+    string table         UTF-8 encoded, NUL separated
+    integer count        uint32
+    integers             uint32[]
+
+The integers encode the Gaphor version of the model, the number of elements,
+followed by each element::
+
+    id type value-count (name value)* reference-count (name ref)*
+
+A reference is either ``0 refid`` for a single reference, or
+``1 count refid*`` for a reference list.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import BinaryIO
+
+from gaphor.storage.parser import element
+
+__all__ = ["dump_snapshot", "load_snapshot", "content_digest", "snapshot_path"]
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"GAPHSNAP"
+FORMAT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snapshot"
+
+_HEADER = struct.Struct(f"<{len(MAGIC)}sI32s")
+_LENGTH = struct.Struct("<I")
+
+_SINGLE = 0
+_LIST = 1
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def content_digest(text: str) -> bytes:
+    """The digest of model file contents, used as key for the snapshot."""
+    return hashlib.sha256(text.encode("utf-8", errors="surrogateescape")).digest()
+
+
+def snapshot_path(filename: str | os.PathLike) -> Path:
+    """The location of the snapshot for a model file."""
+    filename = Path(filename)
+    return filename.with_name(filename.name + SNAPSHOT_SUFFIX)
+
+
+def dump_snapshot(
+    out: BinaryIO, elements: dict[str, element], gaphor_version: str, digest: bytes
+) -> None:
+    """Write parsed elements as snapshot to a binary file."""
+    strings: dict[str, int] = {}
+    ints = array("I")
+
+    def intern(s):
+        try:
+            return strings[s]
+        except KeyError:
+            if "\0" in s:
+                raise SnapshotError(f"Can not store NUL characters: {s!r}") from None
+            n = strings[s] = len(strings)
+            return n
+
+    append = ints.append
+    append(intern(gaphor_version))
+    append(len(elements))
+    for elem in elements.values():
+        append(intern(elem.id))
+        append(intern(elem.type))
+        append(len(elem.values))
+        for name, value in elem.values.items():
+            append(intern(name))
+            append(intern(value))
+        append(len(elem.references))
+        for name, refids in elem.references.items():
+            append(intern(name))
+            if isinstance(refids, list):
+                append(_LIST)
+                append(len(refids))
+                ints.extend(intern(refid) for refid in refids)
+            else:
+                append(_SINGLE)
+                append(intern(refids))
+
+    if sys.byteorder == "big":
+        ints.byteswap()
+
+    string_table = "\0".join(strings).encode("utf-8", errors="surrogateescape")
+    out.write(_HEADER.pack(MAGIC, FORMAT_VERSION, digest))
+    out.write(_LENGTH.pack(len(string_table)))
+    out.write(string_table)
+    out.write(_LENGTH.pack(len(ints)))
+    out.write(ints.tobytes())
+
+
+def load_snapshot(file_obj: BinaryIO, digest: bytes | None = None):
+    """Read a snapshot from a binary file.
+
+    Returns a tuple ``(elements, gaphor_version)``, like the GaphorLoader
+    provides. If a digest is provided, it should match the digest of the
+    snapshot, otherwise a `SnapshotError` is raised.
+    """
+    data = file_obj.read()
+    try:
+        magic, version, snapshot_digest = _HEADER.unpack_from(data, 0)
+    except struct.error as e:
+        raise SnapshotError("Not a model snapshot") from e
+    if magic != MAGIC:
+        raise SnapshotError("Not a model snapshot")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format version {version}")
+    if digest is not None and digest != snapshot_digest:
+        raise SnapshotError("Snapshot does not match model")
+
+    try:
+        offset = _HEADER.size
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        strings = (
+            data[offset : offset + length]
+            .decode("utf-8", errors="surrogateescape")
+            .split("\0")
+        )
+        offset += length
+        (count,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+    except struct.error as e:
+        raise SnapshotError("Snapshot is truncated") from e
+
+    ints = array("I")
+    int_data = data[offset : offset + count * ints.itemsize]
+    if len(int_data) != count * ints.itemsize:
+        raise SnapshotError("Snapshot is truncated")
+    ints.frombytes(int_data)
+    if sys.byteorder == "big":
+        ints.byteswap()
+
+    try:
+        return _decode(strings, ints)
+    except (IndexError, StopIteration) as e:
+        raise SnapshotError("Snapshot is corrupt") from e
+
+
+def _decode(strings, ints):
+    it = iter(ints)
+    gaphor_version = strings[next(it)]
+    elements: dict[str, element] = {}
+    for _ in range(next(it)):
+        elem = element(strings[next(it)], strings[next(it)])
+        values = elem.values
+        for _ in range(next(it)):
+            name = strings[next(it)]
+            values[name] = strings[next(it)]
+        references = elem.references
+        for _ in range(next(it)):
+            name = strings[next(it)]
+            if next(it) == _LIST:
+                references[name] = [strings[next(it)] for _ in range(next(it))]
+            else:
+                references[name] = strings[next(it)]
+        elements[elem.id] = elem
+    return elements, gaphor_version
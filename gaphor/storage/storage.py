@@ -4,71 +4,182 @@ Three functions are exported: `load(file_obj)`loads a model from a
 file. `save(file_obj)` stores the current model in a file.
 """
 
+from __future__ import annotations
+
 __all__ = ["load", "save"]
 
+import contextlib
 import io
 import logging
-from functools import partial
+import os
+import re
+import secrets
+import stat
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Callable
+from xml.sax.saxutils import escape, quoteattr
 
 from gaphor import application
+from gaphor.core.eventmanager import event_handler
 from gaphor.core.modeling.collection import collection
-from gaphor.core.modeling.element import Element
+from gaphor.core.modeling.element import Element, Id
+from gaphor.core.modeling.event import (
+    ElementCreated,
+    ElementDeleted,
+    ElementUpdated,
+    ModelFlushed,
+    ModelReady,
+    RevertibleEvent,
+)
 from gaphor.core.modeling.presentation import Presentation
+from gaphor.core.modeling.properties import derived
 from gaphor.core.modeling.stylesheet import StyleSheet
-from gaphor.storage.parser import GaphorLoader, parse_generator
-from gaphor.storage.xmlwriter import XMLWriter
+from gaphor.storage.snapshot import (
+    SnapshotError,
+    content_digest,
+    dump_snapshot,
+    load_snapshot,
+    snapshot_path,
+)
+from gaphor.storage.parser import (
+    DIAGRAM,
+    ELEMENT,
+    GaphorLoader,
+    ReverseReferences,
+    parse_generator,
+    scan,
+)
 
 FILE_FORMAT_VERSION = "3.0"
 NAMESPACE_MODEL = "http://gaphor.sourceforge.net/model"
+WRITE_BLOCK_SIZE = 64 * 1024
 
 log = logging.getLogger(__name__)
 
 
-def save(out=None, factory=None, status_queue=None):
-    for status in save_generator(out, factory):
+def save(out=None, factory=None, status_queue=None, cache=None):
+    for status in save_generator(out, factory, cache):
         if status_queue:
             status_queue(status)
 
 
-def save_generator(out, factory):
-    """Save the current model using @writer, which is a
-    gaphor.storage.xmlwriter.XMLWriter instance."""
-
-    writer = XMLWriter(out)
-    writer.startDocument()
-    writer.startPrefixMapping("", NAMESPACE_MODEL)
-    writer.startElementNS(
-        (NAMESPACE_MODEL, "gaphor"),
-        None,
-        {
-            (NAMESPACE_MODEL, "version"): FILE_FORMAT_VERSION,
-            (NAMESPACE_MODEL, "gaphor-version"): application.distribution().version,
-        },
-    )
+def save_generator(out, factory, cache: SaveCache | None = None):
+    """Save the current model to ``out``, a text file.
+
+    Elements are serialized to strings, which are buffered and written
+    to ``out`` in large blocks. The output is the same as if it was written
+    with a `gaphor.storage.xmlwriter.XMLWriter`.
 
+    With a `SaveCache`, only elements changed since the previous save are
+    serialized again.
+    """
     size = factory.size()
+    buffer = [
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        f'<gaphor xmlns="{NAMESPACE_MODEL}"'
+        f' version="{FILE_FORMAT_VERSION}"'
+        f" gaphor-version={quoteattr(application.distribution().version)}"
+        + (">" if size else "/>")
+    ]
+    buffered = 0
+
     for n, e in enumerate(factory.values(), start=1):
-        clazz = e.__class__.__name__
-        assert e.id
-        writer.startElement(clazz, {"id": str(e.id)})
-        e.save(partial(save_element, factory=factory, writer=writer))
-        writer.endElement(clazz)
+        fragment = (
+            save_element(e, factory) if cache is None else cache.fragment(e, factory)
+        )
+        buffer.append(fragment)
+        buffered += len(fragment)
+        if buffered >= WRITE_BLOCK_SIZE:
+            out.write("".join(buffer))
+            buffer.clear()
+            buffered = 0
 
         if n % 25 == 0:
             yield (n * 100) / size
 
-    writer.endElementNS((NAMESPACE_MODEL, "gaphor"), None)
-    writer.endPrefixMapping("")
-    writer.endDocument()
+    if size:
+        buffer.append("\n</gaphor>")
+    out.write("".join(buffer))
 
 
-def save_element(name, value, factory, writer):
-    """Save attributes and references from items in the gaphor.UML module.
+def write_atomic(
+    filename: str | os.PathLike,
+    data: str | bytes,
+    progress: Callable[[float], None] | None = None,
+    block_size: int = WRITE_BLOCK_SIZE,
+) -> None:
+    """Write serialized model data to a file, replacing the file atomically.
+
+    The data is written to a temporary file in the same directory and
+    flushed to disk. Only then the temporary file replaces the original
+    file. If anything goes wrong, the original file is left untouched.
+    Text is written UTF-8 encoded, bytes are written as is.
+
+    This function does not touch the model, so it can be called from a
+    worker thread. Progress (0..100) is reported per block written.
+    """
+    filename = Path(filename)
+    tmp = filename.with_name(f".{filename.name}.{secrets.token_hex(4)}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with contextlib.suppress(FileNotFoundError):
+            os.chmod(tmp, stat.S_IMODE(os.stat(filename).st_mode))
+        out = (
+            open(fd, "wb")
+            if isinstance(data, bytes)
+            else open(fd, "w", encoding="utf-8")
+        )
+        with out:
+            size = len(data)
+            for offset in range(0, size, block_size):
+                out.write(data[offset : offset + block_size])
+                if progress:
+                    progress(min(offset + block_size, size) * 100 / size)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, filename)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+    _fsync_directory(filename.parent)
+
+
+def _fsync_directory(path):
+    """Make sure a rename in a directory is persisted (POSIX only)."""
+    if os.name != "posix":
+        return
+    with contextlib.suppress(OSError):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+@lru_cache(maxsize=None)
+def _tags(name):
+    """Start and end tags of a property, with the enclosed value tags."""
+    return (
+        f"\n<{name}>\n<val>",
+        f"</val>\n</{name}>",
+        f"\n<{name}>\n",
+        f"\n</{name}>",
+    )
+
+
+def save_element(element, factory):
+    """Serialize an element, with its attributes and references.
 
     A value may be a primitive (string, int), a
     gaphor.core.modeling.collection (which contains a list of references
-    to other UML elements) or a Diagram (which contains diagram items).
+    to other UML elements) or an Element.
     """
+    assert element.id
+    clazz = element.__class__.__name__
+    fragments = [f"\n<{clazz} id={quoteattr(str(element.id))}"]
+    append = fragments.append
 
     def resolvable(value):
         if value.id and value in factory:
@@ -78,48 +189,106 @@ def save_element(name, value, factory, writer):
         )
         return False
 
-    def save_reference(name, value):
-        """Save a value as a reference to another element in the model.
-
-        This applies to both UML and canvas items.
-        """
-        if resolvable(value):
-            writer.startElement(name, {})
-            writer.startElement("ref", {"refid": value.id})
-            writer.endElement("ref")
-            writer.endElement(name)
-
-    def save_collection(name, value):
-        """Save a list of references."""
-        if value:
-            writer.startElement(name, {})
-            writer.startElement("reflist", {})
-            for v in value:
-                if resolvable(v):
-                    writer.startElement("ref", {"refid": v.id})
-                    writer.endElement("ref")
-            writer.endElement("reflist")
-            writer.endElement(name)
-
-    def save_value(name, value):
-        """Save a value (attribute)."""
-        if value is not None:
-            writer.startElement(name, {})
-            writer.startElement("val", {})
-            if isinstance(value, bool):
-                # Write booleans as 0/1.
-                writer.characters(str(int(value)))
-            else:
-                writer.characters(str(value))
-            writer.endElement("val")
-            writer.endElement(name)
-
-    if isinstance(value, Element):
-        save_reference(name, value)
-    elif isinstance(value, collection):
-        save_collection(name, value)
-    else:
-        save_value(name, value)
+    def save_property(name, value):
+        if isinstance(value, Element):
+            if resolvable(value):
+                _, _, start, end = _tags(name)
+                append(f"{start}<ref refid={quoteattr(value.id)}/>{end}")
+        elif isinstance(value, collection):
+            if value:
+                _, _, start, end = _tags(name)
+                if refs := [
+                    f"<ref refid={quoteattr(v.id)}/>" for v in value if resolvable(v)
+                ]:
+                    append(
+                        start + "<reflist>\n" + "\n".join(refs) + "\n</reflist>" + end
+                    )
+                else:
+                    append(f"{start}<reflist/>{end}")
+        elif value is not None:
+            start, end, _, _ = _tags(name)
+            # Write booleans as 0/1.
+            text = str(int(value)) if isinstance(value, bool) else str(value)
+            append(f"{start}{escape(text)}{end}")
+
+    element.save(save_property)
+
+    if len(fragments) == 1:
+        return f"{fragments[0]}/>"
+    append(f"\n</{clazz}>")
+    fragments[0] += ">"
+    return "".join(fragments)
+
+
+class SaveCache:
+    """Serialized elements, kept between saves.
+
+    A serialized element is kept until the element changes, so that
+    saving a large model after a small edit only serializes the changed
+    elements again. Changes are tracked through the model events.
+    Elements referring to a deleted element are serialized again as well.
+
+    Presentation elements are not cached: their state, such as size and
+    position, can change without any model event.
+    """
+
+    def __init__(self, event_manager):
+        self.event_manager = event_manager
+        self._fragments: dict[Id, str] = {}
+        self._deleted: set[Id] = set()
+
+        event_manager.subscribe(self._on_element_changed)
+        event_manager.subscribe(self._on_element_deleted)
+        event_manager.subscribe(self._on_model_changed)
+
+    def shutdown(self):
+        self.event_manager.unsubscribe(self._on_element_changed)
+        self.event_manager.unsubscribe(self._on_element_deleted)
+        self.event_manager.unsubscribe(self._on_model_changed)
+        self.clear()
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def clear(self):
+        self._fragments.clear()
+        self._deleted.clear()
+
+    def fragment(self, element: Element, factory) -> str:
+        if isinstance(element, Presentation):
+            return save_element(element, factory)
+        if self._deleted:
+            self._discard_references_to_deleted()
+        try:
+            return self._fragments[element.id]
+        except KeyError:
+            fragment = self._fragments[element.id] = save_element(element, factory)
+            return fragment
+
+    def _discard_references_to_deleted(self):
+        refids = re.compile(
+            "|".join(re.escape(f"refid={quoteattr(id)}") for id in self._deleted)
+        )
+        self._fragments = {
+            id: fragment
+            for id, fragment in self._fragments.items()
+            if not refids.search(fragment)
+        }
+        self._deleted.clear()
+
+    @event_handler(ElementUpdated, RevertibleEvent, ElementCreated)
+    def _on_element_changed(self, event):
+        self._fragments.pop(event.element.id, None)
+
+    @event_handler(ElementDeleted)
+    def _on_element_deleted(self, event):
+        self._fragments.pop(event.element.id, None)
+        if self._fragments:
+            self._deleted.add(event.element.id)
+
+    @event_handler(ModelReady, ModelFlushed)
+    def _on_model_changed(self, event):
+        self.clear()
 
 
 def load_elements(elements, factory, modeling_language, gaphor_version="1.0.0"):
@@ -152,6 +321,7 @@ def load_elements_generator(elements, factory, modeling_language, gaphor_version
         elements, factory, modeling_language, gaphor_version, update_status_queue
     )
     yield from _load_attributes_and_references(elements, update_status_queue)
+    _reset_derived_properties(elem.element for elem in elements.values())
 
     upgrade_ensure_style_sheet_is_present(factory)
 
@@ -163,22 +333,14 @@ def load_elements_generator(elements, factory, modeling_language, gaphor_version
 def _load_elements_and_canvasitems(
     elements, factory, modeling_language, gaphor_version, update_status_queue
 ):
+    reverse_references = ReverseReferences(elements.values())
+    upgrade = UpgradePipeline(gaphor_version)
+
     def create_element(elem):
         if elem.element:
             return
-        if version_lower_than(gaphor_version, (2, 1, 0)):
-            elem = upgrade_element_owned_comment_to_comment(elem)
-        if version_lower_than(gaphor_version, (2, 3, 0)):
-            elem = upgrade_package_owned_classifier_to_owned_type(elem)
-            elem = upgrade_implementation_to_interface_realization(elem)
-            elem = upgrade_feature_parameters_to_owned_parameter(elem)
-            elem = upgrade_parameter_owner_formal_param(elem)
-        if version_lower_than(gaphor_version, (2, 5, 0)):
-            elem = upgrade_diagram_element(elem)
-        if version_lower_than(gaphor_version, (2, 6, 0)):
-            elem = upgrade_generalization_arrow_direction(elem)
-        if version_lower_than(gaphor_version, (2, 9, 0)):
-            elem = upgrade_flow_item_to_control_flow_item(elem, elements)
+        if upgrade:
+            elem = upgrade(elem, elements, reverse_references)
 
         if not (cls := modeling_language.lookup_element(elem.type)):
             raise UnknownModelElementError(
@@ -190,7 +352,9 @@ def _load_elements_and_canvasitems(
                 log.warning(
                     "Removing element %s of type %s without diagram", elem.id, cls
                 )
-                assert all(elem.id not in e.references for e in elements.values())
+                for referrer_id in reverse_references.referrers(elem.id):
+                    remove_reference(elements[referrer_id], elem.id)
+                reverse_references.remove(elem)
                 del elements[elem.id]
                 return
 
@@ -214,7 +378,7 @@ def _load_attributes_and_references(elements, update_status_queue):
 
         # load attributes and references:
         for name, value in list(elem.values.items()):
-            elem.element.load(name, value)
+            _bulk_load(elem.element, name, value)
 
         for name, refids in list(elem.references.items()):
             if isinstance(refids, list):
@@ -227,28 +391,65 @@ def _load_attributes_and_references(elements, update_status_queue):
                         )
                         raise
                     else:
-                        elem.element.load(name, ref.element)
+                        _bulk_load(elem.element, name, ref.element)
             else:
                 try:
                     ref = elements[refids]
                 except ValueError:
                     log.exception(f"Invalid ID for reference ({refids})")
                 else:
-                    elem.element.load(name, ref.element)
+                    _bulk_load(elem.element, name, ref.element)
+
+
+def _bulk_load(element: Element, name: str, value) -> None:
+    """Load a value in an element, without sending events or updating
+    derived properties.
+
+    Elements that have their own ``load()`` method are loaded as usual.
+    Once all values are loaded, derived properties should be reset.
+    """
+    if type(element).load is Element.load:
+        getattr(type(element), name).load(element, value, do_notify=False)
+    else:
+        element.load(name, value)
 
 
-def load(file_obj: io.TextIOBase, factory, modeling_language, status_queue=None):
+def _reset_derived_properties(elements) -> None:
+    for element_type in {type(e) for e in elements}:
+        for prop in element_type.umlproperties():
+            if isinstance(prop, derived):
+                prop.invalidate_all()
+
+
+def load(
+    file_obj: io.TextIOBase,
+    factory,
+    modeling_language,
+    status_queue=None,
+    snapshot=False,
+    lazy=False,
+):
     """Load a file and create a model if possible.
 
     Optionally, a status queue function can be given, to which the
     progress is written (as status_queue(progress)).
+
+    If `snapshot` is set, a binary snapshot of the parsed model is
+    used (and stored) next to the model file, to speed up repeated loads
+    of the same model.
+
+    If `lazy` is set, elements are created, but their content is only
+    loaded once an element is accessed. This is useful if only part of
+    a (big) model is used, e.g. when a single diagram is exported.
     """
-    for status in load_generator(file_obj, factory, modeling_language):
+    for status in load_generator(file_obj, factory, modeling_language, snapshot, lazy):
         if status_queue:
             status_queue(status)
 
 
-def load_generator(file_obj: io.TextIOBase, factory, modeling_language):
+def load_generator(
+    file_obj: io.TextIOBase, factory, modeling_language, snapshot=False, lazy=False
+):
     """Load a file and create a model if possible.
 
     This function is a generator. It will yield values from 0 to 100 (%)
@@ -256,36 +457,378 @@ def load_generator(file_obj: io.TextIOBase, factory, modeling_language):
     """
     assert isinstance(file_obj, io.TextIOBase)
 
+    filename = getattr(file_obj, "name", None)
+
+    # The model file is parsed (or checked) first, so the current model
+    # is left intact if the file cannot be loaded.
+    if snapshot and isinstance(filename, str):
+        elements, gaphor_version = yield from _parse_with_snapshot(file_obj, filename)
+        types = {elem.type for elem in elements.values()}
+    elif lazy:
+        loader = GaphorLoader()
+        for percentage in parse_generator(file_obj, loader):
+            yield percentage / 2
+        elements, gaphor_version = loader.elements, loader.gaphor_version
+        types = {elem.type for elem in elements.values()}
+    else:
+        elements = None
+        gaphor_version, types = scan(file_obj)
+
+    _check_version(gaphor_version)
+
+    # Upgrades may change element types
+    if not UpgradePipeline(gaphor_version):
+        _check_element_types(types, modeling_language)
+
+    factory.flush()
+    try:
+        with factory.block_events():
+            if elements is None:
+                yield from _load_streaming(file_obj, factory, modeling_language)
+            else:
+                yield from _load_parsed_elements(
+                    elements, gaphor_version, factory, modeling_language, lazy
+                )
+    except Exception:
+        factory.flush()
+        raise
+
+    yield 100
+    factory.model_ready()
+
+
+def _check_version(gaphor_version):
+    if version_lower_than(gaphor_version, (0, 17, 0)):
+        raise ValueError(
+            f"Gaphor model version should be at least 0.17.0 (found {gaphor_version})"
+        )
+
+
+def _check_element_types(types, modeling_language):
+    for type in types:
+        if not modeling_language.lookup_element(type):
+            raise UnknownModelElementError(
+                f"Type {type} cannot be loaded: no such element"
+            )
+
+
+def _load_streaming(file_obj, factory, modeling_language):
+    loader = StreamingLoader(factory, modeling_language)
+
     # Use the incremental parser and yield the percentage of the file.
-    loader = GaphorLoader()
     for percentage in parse_generator(file_obj, loader):
         if percentage:
             yield percentage / 2
         else:
             yield percentage
 
-    elements = loader.elements
-    gaphor_version = loader.gaphor_version
-
-    if version_lower_than(gaphor_version, (0, 17, 0)):
-        raise ValueError(
-            f"Gaphor model version should be at least 0.17.0 (found {gaphor_version})"
+    if loader.streaming:
+        yield from _load_streamed_elements(loader, factory)
+    else:
+        yield from _load_parsed_elements(
+            loader.elements, loader.gaphor_version, factory, modeling_language
         )
 
+
+def _parse_with_snapshot(file_obj, filename):
+    path = snapshot_path(filename)
+    digest = content_digest(file_obj.read())
+    file_obj.seek(0)
+
+    try:
+        with path.open("rb") as snapshot_file:
+            elements, gaphor_version = load_snapshot(snapshot_file, digest)
+        log.debug(f"Loaded model snapshot {path}")
+    except (OSError, SnapshotError):
+        loader = GaphorLoader()
+        for percentage in parse_generator(file_obj, loader):
+            yield percentage / 2
+        elements, gaphor_version = loader.elements, loader.gaphor_version
+        _write_snapshot(path, elements, gaphor_version, digest)
+
+    return elements, gaphor_version
+
+
+def _write_snapshot(path, elements, gaphor_version, digest):
+    out = io.BytesIO()
+    try:
+        dump_snapshot(out, elements, gaphor_version, digest)
+        write_atomic(path, out.getvalue())
+    except (OSError, SnapshotError):
+        log.warning(f"Could not write model snapshot {path}", exc_info=True)
+
+
+def _load_parsed_elements(
+    elements, gaphor_version, factory, modeling_language, lazy=False
+):
+    _check_version(gaphor_version)
+
     log.info(f"Read {len(elements)} elements from file")
 
-    factory.flush()
-    with factory.block_events():
-        for percentage in load_elements_generator(
-            elements, factory, modeling_language, gaphor_version
-        ):
-            if percentage:
-                yield percentage / 2 + 50
+    # Models that need upgrading are loaded as a whole
+    if lazy and not UpgradePipeline(gaphor_version):
+        _load_lazy_elements(elements, factory, modeling_language)
+        return
+
+    for percentage in load_elements_generator(
+        elements, factory, modeling_language, gaphor_version
+    ):
+        if percentage:
+            yield percentage / 2 + 50
+        else:
+            yield percentage
+
+
+def _load_streamed_elements(loader, factory):
+    removed_ids = loader.removed_ids
+    for elems in loader.pending_presentations.values():
+        for elem in elems:
+            log.warning(
+                "Removing element %s of type %s without diagram", elem.id, elem.type
+            )
+            removed_ids.add(elem.id)
+
+    references = loader.pending_references
+    # References are resolved once, and elements are post-loaded once:
+    size = len(references) + factory.size()
+    progress = 0
+
+    for element, name, refid in references:
+        if refid in removed_ids:
+            continue
+        if not (ref := factory.lookup(refid)):
+            log.error(
+                f"Invalid ID for reference ({refid}) for element {type(element).__name__}.{name}"
+            )
+            raise KeyError(refid)
+        _bulk_load(element, name, ref)
+        progress += 1
+        if progress % 1000 == 0:
+            yield (progress * 50) / size + 50
+
+    _reset_derived_properties(factory.values())
+    upgrade_ensure_style_sheet_is_present(factory)
+
+    for element in factory.lselect():
+        element.postload()
+        progress += 1
+        if progress % 1000 == 0:
+            yield (progress * 50) / size + 50
+
+
+def _load_lazy_elements(elements, factory, modeling_language):
+    """Create lazy elements in the factory.
+
+    The content of an element is loaded once the element is accessed.
+    Elements are created in file order. Presentation elements that appear
+    before their diagram are created right after the diagram.
+
+    Some elements are loaded together with the accessed element:
+
+    * The elements referring to it through an association end that is
+      stored on one side only, such as `TypedElement.type`.
+    * For diagrams and presentation elements, the diagram and all its
+      presentation elements, so connections are restored as a whole.
+
+    Those are loaded in file order, so the model is the same as a model
+    that is loaded at once.
+    """
+    removed_ids: set[Id] = set()
+    pending_presentations: dict[Id, list] = {}
+    reverse_references = ReverseReferences(elements.values())
+    position = {id: n for n, id in enumerate(elements)}
+    loaded_ids: set[Id] = set()
+
+    def load(elem, element):
+        if elem.id in loaded_ids:
+            _load_lazy_element(elem, factory, removed_ids, element)
+            return
+
+        group = {elem.id}
+        todo = [elem]
+        while todo:
+            for id in _companion_ids(
+                todo.pop(), elements, reverse_references, modeling_language
+            ):
+                if id not in group and id not in loaded_ids and id in elements:
+                    group.add(id)
+                    todo.append(elements[id])
+        loaded_ids.update(group)
+
+        for id in sorted(group, key=position.__getitem__):
+            if id == elem.id:
+                _load_lazy_element(elem, factory, removed_ids, element)
+            elif related := factory.lookup(id):
+                factory.materialize(related)
+
+    def create_element(elem, cls):
+        loader = partial(load, elem)
+        if issubclass(cls, Presentation):
+            diagram_id = elem.references["diagram"]
+            if not (diagram := factory.lookup(diagram_id)):
+                pending_presentations.setdefault(diagram_id, []).append((elem, cls))
+                return
+            factory.create_lazy(cls, elem.id, loader, diagram)
+        else:
+            factory.create_lazy(cls, elem.id, loader)
+
+        for pending in pending_presentations.pop(elem.id, ()):
+            create_element(*pending)
+
+    for elem in elements.values():
+        if not (cls := modeling_language.lookup_element(elem.type)):
+            raise UnknownModelElementError(
+                f"Type {elem.type} cannot be loaded: no such element"
+            )
+        if issubclass(cls, Presentation) and "diagram" not in elem.references:
+            log.warning("Removing element %s of type %s without diagram", elem.id, cls)
+            removed_ids.add(elem.id)
+            continue
+        create_element(elem, cls)
+
+    for pending in pending_presentations.values():
+        for elem, cls in pending:
+            log.warning("Removing element %s of type %s without diagram", elem.id, cls)
+            removed_ids.add(elem.id)
+
+    upgrade_ensure_style_sheet_is_present(factory)
+
+
+def _companion_ids(elem, elements, reverse_references, modeling_language):
+    """The ID's of the elements to load together with `elem`.
+
+    Presentation elements are only loaded together with their diagram.
+    """
+    cls = modeling_language.lookup_element(elem.type)
+    is_presentation = issubclass(cls, Presentation)
+    for referrer_id, referrer_cls in _one_sided_referrers(
+        elem, elements, reverse_references, modeling_language
+    ):
+        if is_presentation or not issubclass(referrer_cls, Presentation):
+            yield referrer_id
+
+    diagram_id = elem.references.get("diagram")
+    if is_presentation and (diagram_elem := elements.get(diagram_id)):
+        yield diagram_id
+        yield from diagram_elem.references.get("ownedPresentation", ())
+
+
+def _one_sided_referrers(elem, elements, reverse_references, modeling_language):
+    """The ID's and types of the elements that refer to `elem`, where `elem`
+    does not refer back to them."""
+    for referrer_id in reverse_references.referrers(elem.id):
+        referrer = elements.get(referrer_id)
+        if not referrer or not (cls := modeling_language.lookup_element(referrer.type)):
+            continue
+        for name, refids in referrer.references.items():
+            if elem.id not in (refids if isinstance(refids, list) else (refids,)):
+                continue
+            opposite = getattr(getattr(cls, name, None), "opposite", None)
+            backrefs = elem.references.get(opposite) if opposite else None
+            if referrer_id not in (
+                backrefs if isinstance(backrefs, list) else (backrefs,)
+            ):
+                yield referrer_id, cls
+                break
+
+
+def _load_lazy_element(elem, factory, removed_ids, element):
+    # Look up all references first, so the element is loaded completely.
+    # References to unknown elements are skipped.
+    references = []
+    for name, refids in elem.references.items():
+        for refid in refids if isinstance(refids, list) else (refids,):
+            if refid in removed_ids:
+                continue
+            if not (ref := factory.lookup(refid)):
+                log.error(
+                    f"Invalid ID for reference ({refid}) for element {elem.type}.{name}"
+                )
+                continue
+            references.append((name, ref))
+
+    for name, value in elem.values.items():
+        _bulk_load(element, name, value)
+
+    for name, ref in references:
+        _bulk_load(element, name, ref)
+
+    _reset_derived_properties([element, *(ref for _, ref in references)])
+
+
+class StreamingLoader(GaphorLoader):
+    """A loader that creates model elements while the file is parsed.
+
+    Parsed elements are not retained. Attribute values are loaded directly
+    and references are stored in a compact table, so they can be resolved
+    once all elements exist. References are resolved in file order, so
+    the outcome is the same as for a model loaded via `load_elements()`.
+
+    Models that need upgrading are parsed as a whole, as `GaphorLoader`
+    does, and ``streaming`` is set to `False`.
+    """
+
+    def __init__(self, factory, modeling_language):
+        self.factory = factory
+        self.modeling_language = modeling_language
+        super().__init__()
+
+    def startDocument(self):
+        super().startDocument()
+        self.streaming = False
+        self.pending_references: list[tuple[Element, str, Id]] = []
+        # Presentation elements that are parsed before their diagram
+        self.pending_presentations: dict[Id, list] = {}
+        # Presentation elements without diagram are not loaded
+        self.removed_ids: set[Id] = set()
+
+    def start_root(self, state, name, attrs):
+        if super().start_root(state, name, attrs):
+            # Models that require no upgrades can be loaded while parsing
+            self.streaming = not UpgradePipeline(self.gaphor_version)
+            return True
+
+    def endElement(self, name):
+        if self.streaming and self.state() in (ELEMENT, DIAGRAM):
+            elem = self.pop()
+            del self.elements[elem.id]
+            self.create_element(elem)
+        else:
+            super().endElement(name)
+
+    def create_element(self, elem):
+        if not (cls := self.modeling_language.lookup_element(elem.type)):
+            raise UnknownModelElementError(
+                f"Type {elem.type} cannot be loaded: no such element"
+            )
+
+        factory = self.factory
+        if issubclass(cls, Presentation):
+            if not (diagram_id := elem.references.get("diagram")):
+                log.warning(
+                    "Removing element %s of type %s without diagram", elem.id, cls
+                )
+                self.removed_ids.add(elem.id)
+                return
+            if not (diagram := factory.lookup(diagram_id)):
+                self.pending_presentations.setdefault(diagram_id, []).append(elem)
+                return
+            element = factory.create_as(cls, elem.id, diagram)
+        else:
+            element = factory.create_as(cls, elem.id)
+
+        for name, value in elem.values.items():
+            _bulk_load(element, name, value)
+
+        references = self.pending_references
+        for name, refids in elem.references.items():
+            if isinstance(refids, list):
+                references.extend((element, name, refid) for refid in refids)
             else:
-                yield percentage
+                references.append((element, name, refids))
 
-    yield 100
-    factory.model_ready()
+        for pending in self.pending_presentations.pop(elem.id, ()):
+            self.create_element(pending)
 
 
 def version_lower_than(gaphor_version, version):
@@ -303,6 +846,16 @@ class UnknownModelElementError(Exception):
     pass
 
 
+def remove_reference(elem, refid):
+    """Remove all references to `refid` from a parsed element."""
+    for name, refids in list(elem.references.items()):
+        if isinstance(refids, list):
+            if refid in refids:
+                elem.references[name] = [r for r in refids if r != refid]
+        elif refids == refid:
+            del elem.references[name]
+
+
 # since 2.2.0
 def upgrade_ensure_style_sheet_is_present(factory):
     style_sheet = next(factory.select(StyleSheet), None)
@@ -310,88 +863,122 @@ def upgrade_ensure_style_sheet_is_present(factory):
         factory.create(StyleSheet)
 
 
-# since 2.1.0
-def upgrade_element_owned_comment_to_comment(elem):
-    for name, refids in dict(elem.references).items():
-        if name == "ownedComment":
-            elem.references["comment"] = refids
-            del elem.references["ownedComment"]
-            break
+# Model upgrades: (version, element type, upgrade function).
+# Upgrades are applied in order of registration.
+UPGRADES: list[tuple[tuple[int, int, int], str | None, Callable]] = []
+
+
+def upgrade(version: tuple[int, int, int], type: str | None = None):
+    """Register an upgrade for models saved with a version lower than
+    `version`.
+
+    If a `type` is provided, the upgrade is only applied to elements of that
+    type (the type as it was read from the model file). An upgrade function
+    has the signature ``upgrade(elem, elements, reverse_references) -> elem``.
+    ``reverse_references`` is a `ReverseReferences` index of the parsed
+    elements, for upgrades that need to find the elements referring to `elem`.
+    """
+
+    def register(func):
+        UPGRADES.append((version, type, func))
+        return func
+
+    return register
+
+
+class UpgradePipeline:
+    """The upgrades required for a model, based on the model version.
+
+    Upgrades are looked up once per element type.
+    """
+
+    def __init__(self, gaphor_version: str):
+        self._upgrades = [
+            (type, func)
+            for version, type, func in UPGRADES
+            if version_lower_than(gaphor_version, version)
+        ]
+        self._upgrades_by_type: dict[str, tuple[Callable, ...]] = {}
+
+    def __bool__(self):
+        return bool(self._upgrades)
+
+    def upgrades_for(self, type: str) -> tuple[Callable, ...]:
+        try:
+            return self._upgrades_by_type[type]
+        except KeyError:
+            upgrades = self._upgrades_by_type[type] = tuple(
+                func for t, func in self._upgrades if t is None or t == type
+            )
+            return upgrades
+
+    def __call__(self, elem, elements, reverse_references):
+        for func in self.upgrades_for(elem.type):
+            elem = func(elem, elements, reverse_references)
+        return elem
+
+
+@upgrade((2, 1, 0))
+def upgrade_element_owned_comment_to_comment(elem, elements, reverse_references):
+    if "ownedComment" in elem.references:
+        elem.references["comment"] = elem.references.pop("ownedComment")
     return elem
 
 
-# since 2.3.0
-def upgrade_package_owned_classifier_to_owned_type(elem):
-    for name, refids in dict(elem.references).items():
-        if name == "ownedClassifier":
-            elem.references["ownedType"] = refids
-            del elem.references["ownedClassifier"]
-            break
+@upgrade((2, 3, 0))
+def upgrade_package_owned_classifier_to_owned_type(elem, elements, reverse_references):
+    if "ownedClassifier" in elem.references:
+        elem.references["ownedType"] = elem.references.pop("ownedClassifier")
     return elem
 
 
-# since 2.3.0
-def upgrade_implementation_to_interface_realization(elem):
+@upgrade((2, 3, 0), "Implementation")
+def upgrade_implementation_to_interface_realization(elem, elements, reverse_references):
     if elem.type == "Implementation":
         elem.type = "InterfaceRealization"
     return elem
 
 
-# since 2.3.0
-def upgrade_feature_parameters_to_owned_parameter(elem):
-    formal_params = []
-    return_results = []
-    for name, refids in dict(elem.references).items():
-        if name == "formalParameter":
-            formal_params = refids
-            del elem.references["formalParameter"]
-        elif name == "returnResult":
-            return_results = refids
-            del elem.references["returnResult"]
-    elem.references["ownedParameter"] = formal_params + return_results
+@upgrade((2, 3, 0))
+def upgrade_feature_parameters_to_owned_parameter(elem, elements, reverse_references):
+    references = elem.references
+    if "formalParameter" in references or "returnResult" in references:
+        references["ownedParameter"] = references.pop(
+            "formalParameter", []
+        ) + references.pop("returnResult", [])
     return elem
 
 
-# since 2.3.0
-def upgrade_parameter_owner_formal_param(elem):
-    for name, refids in dict(elem.references).items():
-        if name == "ownerReturnParam":
-            elem.references["ownerFormalParam"] = refids
-            del elem.references["ownerReturnParam"]
-            break
+@upgrade((2, 3, 0))
+def upgrade_parameter_owner_formal_param(elem, elements, reverse_references):
+    if "ownerReturnParam" in elem.references:
+        elem.references["ownerFormalParam"] = elem.references.pop("ownerReturnParam")
     return elem
 
 
-# since 2.5.0
-def upgrade_diagram_element(elem):
-    if elem.type == "Diagram":
-        for name, refids in dict(elem.references).items():
-            if name == "package":
-                elem.references["element"] = refids
-                del elem.references["package"]
-                break
+@upgrade((2, 5, 0), "Diagram")
+def upgrade_diagram_element(elem, elements, reverse_references):
+    if elem.type == "Diagram" and "package" in elem.references:
+        elem.references["element"] = elem.references.pop("package")
     return elem
 
 
-# since 2.6.0
-def upgrade_generalization_arrow_direction(elem):
+@upgrade((2, 6, 0), "GeneralizationItem")
+def upgrade_generalization_arrow_direction(elem, elements, reverse_references):
     if elem.type == "GeneralizationItem":
-        head_ids, tail_ids = 0, 0
-        for name, refids in dict(elem.references).items():
-            if name == "head-connection":
-                head_ids = refids
-            elif name == "tail-connection":
-                tail_ids = refids
+        references = elem.references
+        head_ids = references.get("head-connection")
+        tail_ids = references.get("tail-connection")
         if head_ids and tail_ids:
-            elem.references["head-connection"], elem.references["tail-connection"] = (
+            references["head-connection"], references["tail-connection"] = (
                 tail_ids,
                 head_ids,
             )
     return elem
 
 
-# since 2.9.0
-def upgrade_flow_item_to_control_flow_item(elem, elements):
+@upgrade((2, 9, 0), "FlowItem")
+def upgrade_flow_item_to_control_flow_item(elem, elements, reverse_references):
     if elem.type == "FlowItem":
         if subject_id := elem.references.get("subject"):
             subject_type = elements[subject_id].type
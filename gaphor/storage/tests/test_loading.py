@@ -4,8 +4,15 @@ from xml.sax import SAXParseException
 
 import pytest
 
+from gaphor.core.modeling import Diagram
 from gaphor.storage import storage
-from gaphor.storage.parser import MergeConflictDetected, ParserException
+from gaphor.storage.parser import (
+    GaphorLoader,
+    MergeConflictDetected,
+    ParserException,
+    parse_generator,
+    scan,
+)
 
 
 def buffer(text):
@@ -121,3 +128,171 @@ def test_detect_merge_conflict(element_factory, modeling_language):
         storage.load(file, element_factory, modeling_language)
 
     assert not element_factory.lselect()
+
+
+def test_load_presentation_before_its_diagram(element_factory, modeling_language):
+    file = buffer(
+        """\
+        <?xml version="1.0" encoding="utf-8"?>
+        <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.12.1">
+          <StyleSheet id="58d6989a-66f8-11ec-b4c8-0456e5e540ed" />
+          <Box id="680e2142-3a1d-11dc-8b61-000d93868322">
+            <matrix>
+              <val>(1.0, 0.0, 0.0, 1.0, 214.0, 119.0)</val>
+            </matrix>
+            <diagram>
+              <ref refid="58d6c536-66f8-11ec-b4c8-0456e5e540ed"/>
+            </diagram>
+          </Box>
+          <Diagram id="58d6c536-66f8-11ec-b4c8-0456e5e540ed">
+            <ownedPresentation>
+              <reflist>
+                <ref refid="680e2142-3a1d-11dc-8b61-000d93868322"/>
+              </reflist>
+            </ownedPresentation>
+          </Diagram>
+        </gaphor>
+        """
+    )
+
+    storage.load(file, element_factory, modeling_language)
+
+    box = element_factory.lookup("680e2142-3a1d-11dc-8b61-000d93868322")
+    diagram = element_factory.lookup("58d6c536-66f8-11ec-b4c8-0456e5e540ed")
+
+    assert box.diagram is diagram
+    assert box in diagram.ownedPresentation
+    assert tuple(box.matrix) == (1.0, 0.0, 0.0, 1.0, 214.0, 119.0)
+
+
+def test_load_model_with_invalid_reference(element_factory, modeling_language):
+    file = buffer(
+        """\
+        <?xml version="1.0" encoding="utf-8"?>
+        <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.12.1">
+          <StyleSheet id="58d6989a-66f8-11ec-b4c8-0456e5e540ed" />
+          <Diagram id="58d6c536-66f8-11ec-b4c8-0456e5e540ed">
+            <element>
+              <ref refid="c3ee4d1c-66f8-11ec-b4c8-0456e5e540ed"/>
+            </element>
+          </Diagram>
+        </gaphor>
+        """
+    )
+
+    with pytest.raises(KeyError):
+        storage.load(file, element_factory, modeling_language)
+
+    assert not element_factory.lselect()
+
+
+@pytest.mark.parametrize(
+    "model",
+    ["simple-items.gaphor", "RAAML-incoming.gaphor", "wrong-encoding.gaphor"],
+)
+def test_streaming_load_matches_load_of_parsed_elements(
+    element_factory, modeling_language, saver, test_models, model
+):
+    loader = GaphorLoader()
+    with (test_models / model).open(encoding="utf-8", errors="replace") as file:
+        for _ in parse_generator(file, loader):
+            pass
+        with element_factory.block_events():
+            storage.load_elements(
+                loader.elements,
+                element_factory,
+                modeling_language,
+                loader.gaphor_version,
+            )
+        expected = saver()
+
+        file.seek(0)
+        storage.load(file, element_factory, modeling_language)
+
+    assert saver() == expected
+
+
+def test_load_presentation_without_diagram(element_factory, modeling_language):
+    file = buffer(
+        """\
+        <?xml version="1.0" encoding="utf-8"?>
+        <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.12.1">
+          <StyleSheet id="58d6989a-66f8-11ec-b4c8-0456e5e540ed" />
+          <Diagram id="58d6c536-66f8-11ec-b4c8-0456e5e540ed">
+            <ownedPresentation>
+              <reflist>
+                <ref refid="680e2142-3a1d-11dc-8b61-000d93868322"/>
+              </reflist>
+            </ownedPresentation>
+          </Diagram>
+          <Box id="680e2142-3a1d-11dc-8b61-000d93868322" />
+        </gaphor>
+        """
+    )
+
+    storage.load(file, element_factory, modeling_language)
+
+    diagram = element_factory.lookup("58d6c536-66f8-11ec-b4c8-0456e5e540ed")
+
+    assert not element_factory.lookup("680e2142-3a1d-11dc-8b61-000d93868322")
+    assert not diagram.ownedPresentation
+
+
+@pytest.mark.parametrize(
+    "text,error",
+    [
+        ("Hello world", SAXParseException),
+        ("<html><p>Hello</p></html>", ParserException),
+        (
+            """\
+            <?xml version="1.0" encoding="utf-8"?>
+            <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.12.1">
+            <<<<<<< HEAD
+              <Diagram id="58d6c536-66f8-11ec-b4c8-0456e5e540ed" />
+            =======
+            >>>>>>> 12345678 (incoming change)
+            </gaphor>
+            """,
+            MergeConflictDetected,
+        ),
+        (
+            """\
+            <?xml version="1.0" encoding="utf-8"?>
+            <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.12.1">
+              <StyleSheet id="58d6989a-66f8-11ec-b4c8-0456e5e540ed" />
+              <FooBar id="c3ee4d1c-66f8-11ec-b4c8-0456e5e540ed" />
+            </gaphor>
+            """,
+            storage.UnknownModelElementError,
+        ),
+        (
+            """\
+            <?xml version="1.0" encoding="utf-8"?>
+            <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="0.16.0">
+              <Diagram id="58d6c536-66f8-11ec-b4c8-0456e5e540ed" />
+            </gaphor>
+            """,
+            ValueError,
+        ),
+    ],
+)
+@pytest.mark.parametrize("lazy", [False, True])
+def test_failed_load_keeps_current_model(
+    element_factory, modeling_language, text, error, lazy
+):
+    diagram = element_factory.create(Diagram)
+
+    with pytest.raises(error):
+        storage.load(buffer(text), element_factory, modeling_language, lazy=lazy)
+
+    assert element_factory.lselect() == [diagram]
+
+
+def test_scan_model_file(test_models):
+    with (test_models / "test-model.gaphor").open(encoding="utf-8") as model:
+        gaphor_version, types = scan(model)
+
+        assert model.tell() == 0
+
+    assert gaphor_version == "1.1.0"
+    assert {"Diagram", "Package", "Class"} <= types
@@ -1,6 +1,16 @@
 from io import StringIO
 
-from gaphor.storage.parser import parse
+import pytest
+
+from gaphor.storage.parser import (
+    BLOCK_SIZE,
+    GaphorLoader,
+    MergeConflictDetected,
+    ReverseReferences,
+    element,
+    parse,
+    parse_generator,
+)
 
 
 def test_parsing_v2_1_model_with_grouped_item(test_models):
@@ -60,3 +70,68 @@ def test_parsing_of_xml_external_entities_should_fail(test_models):
 
     assert elements
     assert elements["0"].values["name"] == ""
+
+
+def test_parsing_in_small_blocks(test_models):
+    def parse_with_block_size(block_size):
+        loader = GaphorLoader()
+        with (test_models / "all-elements.gaphor").open(encoding="utf-8") as model:
+            progress = list(parse_generator(model, loader, block_size))
+        return loader.elements, progress
+
+    elements, _ = parse_with_block_size(BLOCK_SIZE)
+    small_block_elements, progress = parse_with_block_size(13)
+
+    assert elements.keys() == small_block_elements.keys()
+    assert all(
+        e.type == s.type and e.values == s.values and e.references == s.references
+        for e, s in zip(elements.values(), small_block_elements.values())
+    )
+    assert progress == sorted(progress)
+
+
+def test_parsing_of_binary_file(test_models):
+    with (test_models / "test-model.gaphor").open("rb") as model:
+        elements = parse(model)
+
+    assert elements
+
+
+def test_detect_merge_conflict_across_blocks():
+    model = StringIO(
+        """<?xml version="1.0" encoding="utf-8"?>
+<gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.9.2">
+ <Package id="0">
+  <name>
+<<<<<<< HEAD
+   <val>old</val>
+=======
+   <val>new</val>
+>>>>>>> 12345678 (incoming change)
+  </name>
+ </Package>
+</gaphor>"""
+    )
+
+    with pytest.raises(MergeConflictDetected):
+        for _ in parse_generator(model, GaphorLoader(), block_size=3):
+            pass
+
+
+def test_reverse_references():
+    package = element("1", "Package")
+    klass = element("2", "Class")
+    diagram = element("3", "Diagram")
+    package.references["ownedType"] = [klass.id]
+    klass.references["package"] = package.id
+    diagram.references["element"] = package.id
+
+    reverse_references = ReverseReferences([package, klass, diagram])
+
+    assert reverse_references.referrers(package.id) == {klass.id, diagram.id}
+    assert reverse_references.referrers(klass.id) == {package.id}
+    assert reverse_references.referrers(diagram.id) == set()
+
+    reverse_references.remove(diagram)
+
+    assert reverse_references.referrers(package.id) == {klass.id}
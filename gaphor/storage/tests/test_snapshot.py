@@ -0,0 +1,106 @@
+import io
+import shutil
+from pathlib import Path
+
+import pytest
+
+from gaphor.storage import storage
+from gaphor.storage.parser import GaphorLoader, parse_generator
+from gaphor.storage.snapshot import (
+    SnapshotError,
+    content_digest,
+    dump_snapshot,
+    load_snapshot,
+    snapshot_path,
+)
+
+TEST_MODELS = sorted((Path(__file__).parents[3] / "test-models").glob("*.gaphor"))
+
+
+def parse_model(path):
+    loader = GaphorLoader()
+    with path.open(encoding="utf-8", errors="replace") as file:
+        text = file.read()
+        file.seek(0)
+        for _ in parse_generator(file, loader):
+            pass
+    return loader.elements, loader.gaphor_version, content_digest(text)
+
+
+@pytest.mark.parametrize("path", TEST_MODELS, ids=lambda p: p.name)
+def test_snapshot_round_trip(path):
+    elements, gaphor_version, digest = parse_model(path)
+
+    buffer = io.BytesIO()
+    dump_snapshot(buffer, elements, gaphor_version, digest)
+    buffer.seek(0)
+    loaded_elements, loaded_version = load_snapshot(buffer, digest)
+
+    assert loaded_version == gaphor_version
+    assert list(loaded_elements) == list(elements)
+    for id, elem in elements.items():
+        loaded = loaded_elements[id]
+        assert loaded.type == elem.type
+        assert loaded.values == elem.values
+        assert loaded.references == elem.references
+
+
+def test_snapshot_with_different_digest(test_models):
+    elements, gaphor_version, digest = parse_model(test_models / "simple-items.gaphor")
+    buffer = io.BytesIO()
+    dump_snapshot(buffer, elements, gaphor_version, digest)
+    buffer.seek(0)
+
+    with pytest.raises(SnapshotError):
+        load_snapshot(buffer, content_digest("other model"))
+
+
+def test_truncated_snapshot(test_models):
+    elements, gaphor_version, digest = parse_model(test_models / "simple-items.gaphor")
+    buffer = io.BytesIO()
+    dump_snapshot(buffer, elements, gaphor_version, digest)
+
+    with pytest.raises(SnapshotError):
+        load_snapshot(io.BytesIO(buffer.getvalue()[:-10]))
+
+
+def test_not_a_snapshot():
+    with pytest.raises(SnapshotError):
+        load_snapshot(io.BytesIO(b"<?xml"))
+
+
+def test_load_model_with_snapshot(
+    element_factory, modeling_language, saver, test_models, tmp_path
+):
+    model = tmp_path / "simple-items.gaphor"
+    shutil.copyfile(test_models / "simple-items.gaphor", model)
+
+    with model.open(encoding="utf-8") as file:
+        storage.load(file, element_factory, modeling_language, snapshot=True)
+    expected = saver()
+
+    assert set(tmp_path.iterdir()) == {model, snapshot_path(model)}
+
+    with model.open(encoding="utf-8") as file:
+        storage.load(file, element_factory, modeling_language, snapshot=True)
+
+    assert saver() == expected
+
+
+def test_outdated_snapshot_is_replaced(
+    element_factory, modeling_language, test_models, tmp_path
+):
+    model = tmp_path / "model.gaphor"
+    shutil.copyfile(test_models / "simple-items.gaphor", model)
+    with model.open(encoding="utf-8") as file:
+        storage.load(file, element_factory, modeling_language, snapshot=True)
+    shutil.copyfile(test_models / "test-model.gaphor", model)
+
+    with model.open(encoding="utf-8") as file:
+        storage.load(file, element_factory, modeling_language, snapshot=True)
+
+    digest = content_digest(model.read_text(encoding="utf-8"))
+    with snapshot_path(model).open("rb") as snapshot_file:
+        elements, _ = load_snapshot(snapshot_file, digest)
+
+    assert elements
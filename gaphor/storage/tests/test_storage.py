@@ -5,12 +5,16 @@ from io import StringIO
 
 import pytest
 
-from gaphor import UML
-from gaphor.core.modeling import Comment, Diagram, StyleSheet
+from gaphor import UML, application
+from gaphor.core.modeling import Comment, Diagram, Element, StyleSheet
+from gaphor.core.modeling.collection import collection
 from gaphor.diagram.general import CommentItem
 from gaphor.diagram.tests.fixtures import connect
 from gaphor.storage import storage
+from gaphor.storage.xmlwriter import XMLWriter
+from gaphor.transaction import Transaction
 from gaphor.UML.classes import AssociationItem, ClassItem, InterfaceItem
+from gaphor.UML.classes.interface import Folded
 
 
 class PseudoFile:
@@ -247,6 +251,156 @@ def test_load_and_save_of_a_model(element_factory, modeling_language, test_model
     assert copy == orig, "Saved model does not match copy"
 
 
+def save_with_xml_writer(out, factory):
+    """Reference implementation: save a model with the XMLWriter."""
+    writer = XMLWriter(out)
+    writer.startDocument()
+    writer.startPrefixMapping("", storage.NAMESPACE_MODEL)
+    writer.startElementNS(
+        (storage.NAMESPACE_MODEL, "gaphor"),
+        None,
+        {
+            (storage.NAMESPACE_MODEL, "version"): storage.FILE_FORMAT_VERSION,
+            (
+                storage.NAMESPACE_MODEL,
+                "gaphor-version",
+            ): application.distribution().version,
+        },
+    )
+
+    def save_element(name, value):
+        if value is None or (isinstance(value, collection) and not value):
+            return
+        writer.startElement(name, {})
+        if isinstance(value, Element):
+            writer.startElement("ref", {"refid": value.id})
+            writer.endElement("ref")
+        elif isinstance(value, collection):
+            writer.startElement("reflist", {})
+            for v in value:
+                writer.startElement("ref", {"refid": v.id})
+                writer.endElement("ref")
+            writer.endElement("reflist")
+        else:
+            writer.startElement("val", {})
+            writer.characters(str(int(value) if isinstance(value, bool) else value))
+            writer.endElement("val")
+        writer.endElement(name)
+
+    for e in factory.values():
+        writer.startElement(e.__class__.__name__, {"id": e.id})
+        e.save(save_element)
+        writer.endElement(e.__class__.__name__)
+
+    writer.endElementNS((storage.NAMESPACE_MODEL, "gaphor"), None)
+    writer.endPrefixMapping("")
+    writer.endDocument()
+
+
+@pytest.mark.parametrize(
+    "model", ["simple-items.gaphor", "multiple-messages.gaphor", "dbus.gaphor"]
+)
+def test_save_is_the_same_as_xml_writer_output(
+    element_factory, modeling_language, test_models, saver, model
+):
+    with open(test_models / model, encoding="utf-8") as ifile:
+        storage.load(ifile, element_factory, modeling_language)
+    expected = StringIO()
+
+    save_with_xml_writer(expected, element_factory)
+
+    assert saver() == expected.getvalue()
+
+
+@pytest.mark.parametrize(
+    "model", ["simple-items.gaphor", "dbus.gaphor", "RAAML-incoming.gaphor"]
+)
+def test_lazy_load_is_the_same_as_full_load(
+    element_factory, modeling_language, test_models, saver, model
+):
+    with open(test_models / model, encoding="utf-8") as ifile:
+        storage.load(ifile, element_factory, modeling_language)
+    expected = saver()
+
+    element_factory.flush()
+    with open(test_models / model, encoding="utf-8") as ifile:
+        storage.load(ifile, element_factory, modeling_language, lazy=True)
+
+    assert saver() == expected
+
+
+def test_lazy_load_sets_association_ends_stored_on_the_other_side(
+    element_factory, modeling_language, test_models
+):
+    with open(test_models / "RAAML-incoming.gaphor", encoding="utf-8") as ifile:
+        storage.load(ifile, element_factory, modeling_language)
+    expected = {c.id: len(c.extension) for c in element_factory.select(UML.Class)}
+
+    element_factory.flush()
+    with open(test_models / "RAAML-incoming.gaphor", encoding="utf-8") as ifile:
+        storage.load(ifile, element_factory, modeling_language, lazy=True)
+
+    assert {
+        c.id: len(c.extension) for c in element_factory.select(UML.Class)
+    } == expected
+
+
+def test_lazy_load_loads_elements_referring_through_one_sided_ends(
+    element_factory, modeling_language, saver
+):
+    cls = element_factory.create(UML.Class)
+    cls.name = "c"
+    prop = element_factory.create(UML.Property)
+    prop.type = cls
+    other = element_factory.create(UML.Property)
+    ids = cls.id, prop.id, other.id
+    data = saver()
+
+    element_factory.flush()
+    storage.load(StringIO(data), element_factory, modeling_language, lazy=True)
+
+    lazy_class, lazy_prop, lazy_other = map(element_factory.lookup, ids)
+    assert lazy_class.name == "c"
+    assert type(lazy_prop) is UML.Property
+    assert type(lazy_other) is not UML.Property
+
+
+def test_lazy_load_loads_presentation_elements_per_diagram(
+    element_factory, modeling_language, saver
+):
+    diagram = element_factory.create(Diagram)
+    item = diagram.create(ClassItem)
+    other = diagram.create(ClassItem)
+    other_diagram = element_factory.create(Diagram)
+    other_item = other_diagram.create(ClassItem)
+    ids = item.id, other.id, other_item.id
+    data = saver()
+
+    element_factory.flush()
+    storage.load(StringIO(data), element_factory, modeling_language, lazy=True)
+
+    lazy_item, lazy_other, lazy_other_item = map(element_factory.lookup, ids)
+    assert lazy_item.matrix
+    assert type(lazy_other) is ClassItem
+    assert type(lazy_other_item) is not ClassItem
+
+
+def test_lazy_load_skips_dangling_references(element_factory, modeling_language, saver):
+    package = element_factory.create(UML.Package)
+    cls = element_factory.create(UML.Class)
+    cls.name = "c"
+    cls.package = package
+    cls_id = cls.id
+    data = saver().replace(f'refid="{package.id}"', 'refid="unknown"')
+
+    element_factory.flush()
+    storage.load(StringIO(data), element_factory, modeling_language, lazy=True)
+    lazy_class = element_factory.lookup(cls_id)
+
+    assert lazy_class.name == "c"
+    assert type(lazy_class) is UML.Class
+
+
 def test_can_not_load_models_older_that_0_17_0(
     element_factory, modeling_language, test_models
 ):
@@ -286,3 +440,116 @@ def test_save_with_invalidreference(element_factory, saver, caplog):
     assert p.id in data
     assert c.id not in data
     assert "Model has unknown reference" in caplog.text
+
+
+def test_write_atomic(tmp_path):
+    filename = tmp_path / "model.gaphor"
+    filename.write_text("old", encoding="utf-8")
+    progress = []
+
+    storage.write_atomic(filename, "new model", progress.append, block_size=4)
+
+    assert filename.read_text(encoding="utf-8") == "new model"
+    assert progress == [400 / 9, 800 / 9, 100]
+    assert list(tmp_path.iterdir()) == [filename]
+
+
+def test_write_atomic_with_bytes(tmp_path):
+    filename = tmp_path / "model.bin"
+
+    storage.write_atomic(filename, b"\0binary")
+
+    assert filename.read_bytes() == b"\0binary"
+    assert list(tmp_path.iterdir()) == [filename]
+
+
+def test_write_atomic_leaves_file_untouched_on_error(tmp_path):
+    filename = tmp_path / "model.gaphor"
+    filename.write_text("old", encoding="utf-8")
+
+    def progress(_percentage):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        storage.write_atomic(filename, "new model", progress)
+
+    assert filename.read_text(encoding="utf-8") == "old"
+    assert list(tmp_path.iterdir()) == [filename]
+
+
+@pytest.fixture
+def save_cache(event_manager):
+    save_cache = storage.SaveCache(event_manager)
+    yield save_cache
+    save_cache.shutdown()
+
+
+def save_with_cache(element_factory, save_cache):
+    out = StringIO()
+    storage.save(out, element_factory, cache=save_cache)
+    return out.getvalue()
+
+
+def test_save_with_cache(element_factory, save_cache, saver):
+    package = element_factory.create(UML.Package)
+    klass = element_factory.create(UML.Class)
+    klass.package = package
+
+    assert save_with_cache(element_factory, save_cache) == saver()
+    assert len(save_cache) == 2
+
+    klass.name = "Foo"
+
+    assert save_with_cache(element_factory, save_cache) == saver()
+    assert "<val>Foo</val>" in saver()
+
+
+def test_save_cache_drops_changed_elements_only(element_factory, save_cache):
+    package = element_factory.create(UML.Package)
+    klass = element_factory.create(UML.Class)
+    save_with_cache(element_factory, save_cache)
+
+    package.name = "Bar"
+
+    assert len(save_cache) == 1
+    assert save_cache.fragment(klass, element_factory) is save_cache.fragment(
+        klass, element_factory
+    )
+
+
+def test_save_cache_with_deleted_element(element_factory, save_cache, saver):
+    diagram = element_factory.create(Diagram)
+    comment = element_factory.create(Comment)
+    item = diagram.create(CommentItem, subject=comment)
+    save_with_cache(element_factory, save_cache)
+
+    item.unlink()
+
+    assert item.id not in save_with_cache(element_factory, save_cache)
+    assert save_with_cache(element_factory, save_cache) == saver()
+
+
+def test_save_cache_with_changed_item_state(
+    element_factory, event_manager, save_cache, saver
+):
+    diagram = element_factory.create(Diagram)
+    with Transaction(event_manager):
+        item = diagram.create(
+            InterfaceItem, subject=element_factory.create(UML.Interface)
+        )
+        item.folded = Folded.PROVIDED
+    save_with_cache(element_factory, save_cache)
+
+    with Transaction(event_manager):
+        item.folded = Folded.NONE
+
+    assert save_with_cache(element_factory, save_cache) == saver()
+
+
+def test_save_cache_is_cleared_on_flush(element_factory, save_cache):
+    element_factory.create(UML.Class)
+    save_with_cache(element_factory, save_cache)
+
+    element_factory.flush()
+
+    assert len(save_cache) == 0
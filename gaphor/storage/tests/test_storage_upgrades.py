@@ -1,7 +1,14 @@
 import pytest
 
-from gaphor.storage.parser import element
-from gaphor.storage.storage import load_elements
+from gaphor.storage import storage
+from gaphor.storage.parser import ReverseReferences, element
+from gaphor.storage.storage import (
+    UpgradePipeline,
+    load_elements,
+    upgrade_element_owned_comment_to_comment,
+    upgrade_flow_item_to_control_flow_item,
+    upgrade_generalization_arrow_direction,
+)
 from gaphor.storage.upgrade_canvasitem import upgrade_canvasitem
 from gaphor.UML import diagramitems
 
@@ -108,3 +115,70 @@ def test_upgrade_flow_item_to_object_flow_item(element_factory, modeling_languag
     )
 
     assert element_factory.lselect(diagramitems.ObjectFlowItem)
+
+
+def test_remove_presentation_without_diagram(element_factory, modeling_language):
+    diagram = element(id="1", type="Diagram")
+    item = element(id="2", type="ClassItem")
+    diagram.references["ownedPresentation"] = [item.id]
+
+    load_elements(
+        {p.id: p for p in (diagram, item)}, element_factory, modeling_language
+    )
+
+    assert not element_factory.lselect(diagramitems.ClassItem)
+    assert not element_factory.lselect()[0].ownedPresentation
+
+
+def test_upgrade_pipeline_for_current_model():
+    assert not UpgradePipeline("2.18.0")
+
+
+def test_upgrade_pipeline_selects_upgrades_by_version():
+    pipeline = UpgradePipeline("2.8.2")
+
+    assert pipeline.upgrades_for("FlowItem") == (
+        upgrade_flow_item_to_control_flow_item,
+    )
+    assert pipeline.upgrades_for("Class") == ()
+
+
+def test_upgrade_pipeline_selects_upgrades_by_type():
+    pipeline = UpgradePipeline("2.0.0")
+
+    assert upgrade_generalization_arrow_direction in pipeline.upgrades_for(
+        "GeneralizationItem"
+    )
+    assert upgrade_generalization_arrow_direction not in pipeline.upgrades_for("Class")
+    assert upgrade_element_owned_comment_to_comment in pipeline.upgrades_for("Class")
+
+
+def test_upgrade_pipeline_renames_references():
+    elem = element(id="1", type="Operation")
+    elem.references["formalParameter"] = ["2"]
+    elem.references["returnResult"] = ["3"]
+    elem.references["ownedComment"] = ["4"]
+
+    elem = UpgradePipeline("2.0.0")(elem, {}, ReverseReferences())
+
+    assert elem.references == {"ownedParameter": ["2", "3"], "comment": ["4"]}
+
+
+def test_upgrades_can_look_up_referrers(
+    element_factory, modeling_language, monkeypatch
+):
+    package = element(id="1", type="Package")
+    cls = element(id="2", type="Class")
+    package.references["ownedType"] = [cls.id]
+    referrers = {}
+
+    def upgrade_class(elem, elements, reverse_references):
+        referrers[elem.id] = reverse_references.referrers(elem.id)
+        return elem
+
+    monkeypatch.setattr(storage, "UPGRADES", [((2, 1, 0), "Class", upgrade_class)])
+    load_elements(
+        {p.id: p for p in (package, cls)}, element_factory, modeling_language, "2.0.0"
+    )
+
+    assert referrers == {"2": {"1"}}
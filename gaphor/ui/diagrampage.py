@@ -12,8 +12,9 @@ from gi.repository import Adw, Gdk, GdkPixbuf, Gtk
 
 from gaphor.core import event_handler, gettext
 from gaphor.core.modeling import StyleSheet
-from gaphor.core.modeling.diagram import Diagram, StyledDiagram
+from gaphor.core.modeling.diagram import Diagram, StyledDiagram, StyledItem
 from gaphor.core.modeling.event import AttributeUpdated, ElementDeleted
+from gaphor.core.styling import CompiledStyleSheet
 from gaphor.diagram.diagramtoolbox import get_tool_def, tooliter
 from gaphor.diagram.painter import DiagramTypePainter, ItemPainter
 from gaphor.diagram.selection import Selection
@@ -81,6 +82,7 @@ class DiagramPage:
         self.view: Optional[GtkView] = None
         self.widget: Optional[Gtk.Widget] = None
         self.diagram_css: Optional[Gtk.CssProvider] = None
+        self.compiled_style_sheet: Optional[CompiledStyleSheet] = None
 
         self.rubberband_state = RubberbandState()
         self._notify_dark_id = self.style_manager.connect(
@@ -178,15 +180,10 @@ class DiagramPage:
 
     @event_handler(AttributeUpdated)
     def _on_attribute_updated(self, event: AttributeUpdated):
-        if (
-            event.property is StyleSheet.styleSheet
-            or event.property is StyleSheet.naturalLanguage
-        ):
+        if event.property is StyleSheet.styleSheet and self.view:
+            self.update_drawing_style(self._items_with_changed_style())
+        elif event.property is StyleSheet.naturalLanguage and self.view:
             self.update_drawing_style()
-
-            diagram = self.diagram
-            for item in diagram.get_all_items():
-                diagram.request_update(item)
         elif event.property is Diagram.name and self.view:
             self.view.update_back_buffer()
 
@@ -217,12 +214,52 @@ class DiagramPage:
         else:
             self.view.set_cursor(None)
 
-    def update_drawing_style(self):
+    def _items_with_changed_style(self):
+        """Items that are matched by a rule that changed since the style sheet
+        was last applied.
+
+        Falls back to all items if the changes can not be pinned down.
+        """
+        assert self.view
+        items = self.diagram.get_all_items()
+        previous = self.compiled_style_sheet
+        style_sheet = self.diagram.styleSheet
+        if not (previous and style_sheet):
+            return items
+
+        changed_selectors = style_sheet.compiled_style_sheet.changed_selectors(previous)
+        if changed_selectors is None:
+            return items
+
+        selection = self.view.selection
+        dark_mode = self.style_manager.get_dark()
+        return [
+            item
+            for item in items
+            if any(
+                selector(node)
+                for node in (
+                    StyledItem(item),
+                    StyledItem(item, selection, dark_mode),
+                )
+                for selector in changed_selectors
+            )
+        ]
+
+    def update_drawing_style(self, dirty_items=None):
         """Set the drawing style for the diagram based on the active style
-        sheet."""
+        sheet.
+
+        By default, all items are updated. Provide `dirty_items` if only
+        those items need to be updated.
+        """
         assert self.view
         assert self.diagram_css
 
+        style_sheet = self.diagram.styleSheet
+        self.compiled_style_sheet = (
+            style_sheet.compiled_style_sheet if style_sheet else None
+        )
         dark_mode = self.style_manager.get_dark()
         style = self.diagram.style(StyledDiagram(self.diagram, dark_mode=dark_mode))
 
@@ -256,7 +293,9 @@ class DiagramPage:
             .append(DiagramTypePainter(self.diagram))
         )
 
-        view.request_update(self.diagram.get_all_items())
+        view.request_update(
+            self.diagram.get_all_items() if dirty_items is None else dirty_items
+        )
 
     def _on_view_selection_changed(self, item):
         view = self.view
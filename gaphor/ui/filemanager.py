@@ -2,14 +2,16 @@
 
 from __future__ import annotations
 
+import io
 import logging
 import tempfile
+import threading
 from functools import partial
 from pathlib import Path
 from typing import Callable
 
 from gaphas.decorators import g_async
-from gi.repository import Adw, Gtk
+from gi.repository import Adw, GLib, Gtk
 
 from gaphor import UML
 from gaphor.abc import ActionProvider, Service
@@ -22,6 +24,7 @@ from gaphor.event import (
     SessionCreated,
     SessionShutdown,
     SessionShutdownRequested,
+    TransactionCommit,
 )
 from gaphor.storage import storage
 from gaphor.storage.mergeconflict import split_ours_and_theirs
@@ -79,14 +82,22 @@ class FileManager(Service, ActionProvider):
         self.modeling_language = modeling_language
         self.main_window = main_window
         self._filename: Path | None = None
+        self._save_cache = storage.SaveCache(event_manager)
+        self._writer = BackgroundWriter()
+        # Changed on every model change, so a save can tell if the model
+        # was changed while it was saved
+        self._revision = 0
 
         event_manager.subscribe(self._on_session_shutdown_request)
         event_manager.subscribe(self._on_session_created)
+        event_manager.subscribe(self._on_transaction_commit)
 
     def shutdown(self):
         """Called when shutting down the file manager service."""
         self.event_manager.unsubscribe(self._on_session_shutdown_request)
         self.event_manager.unsubscribe(self._on_session_created)
+        self.event_manager.unsubscribe(self._on_transaction_commit)
+        self._save_cache.shutdown()
 
     @property
     def filename(self) -> Path | None:
@@ -190,6 +201,7 @@ class FileManager(Service, ActionProvider):
                             incoming_element_factory,
                         )
                     )
+                self._save_cache.clear()
 
                 if on_load_done:
                     on_load_done()
@@ -290,13 +302,21 @@ class FileManager(Service, ActionProvider):
                 close=lambda: self.event_manager.handle(SessionShutdown(self)),
             )
 
-    def save(self, filename, on_save_done=None):
+    def save(self, filename, on_save_done=None, background=False):
         """Save the current UML model to the specified file name.
 
         Before writing the model file, this will verify that there are
         no orphan references.  It will also verify that the filename has
         the correct extension.  A status window is displayed while the
-        GIdleThread is executed.  This thread actually saves the model.
+        GIdleThread is executed.  This thread serializes the model in
+        memory.
+
+        The serialized model is written to a temporary file, which replaces
+        the model file once it's completely written. If ``background`` is
+        set, the file is written from a worker thread, so the user interface
+        stays responsive. While a file is written in the background, other
+        saves are queued. If the model is changed while it's saved, the
+        `ModelSaved` event is marked as ``modified``.
         """
 
         if not filename or (filename.exists() and not filename.is_file()):
@@ -308,30 +328,51 @@ class FileManager(Service, ActionProvider):
             parent=self.parent_window,
         )
 
-        @g_async()
-        def async_saver():
-            try:
-                with filename.open("w", encoding="utf-8") as out:
-                    for percentage in storage.save_generator(out, self.element_factory):
-                        status_window.progress(percentage)
-                        yield
+        revision = self._revision
 
-                self.filename = filename
-                self.event_manager.handle(ModelSaved(self, filename))
-            except Exception as e:
+        def write_progress(percentage):
+            status_window.progress(50 + percentage / 2)
+
+        def done(error=None):
+            status_window.destroy()
+            if error:
                 error_handler(
                     message=gettext("Unable to save model “{filename}”.").format(
                         filename=filename
                     ),
-                    secondary_message=error_message(e),
+                    secondary_message=error_message(error),
                     window=self.parent_window,
                 )
-                raise
-            finally:
-                status_window.destroy()
+                return
+
+            self.filename = filename
+            self.event_manager.handle(
+                ModelSaved(self, filename, modified=self._revision != revision)
+            )
             if on_save_done:
                 on_save_done()
 
+        @g_async()
+        def async_saver():
+            try:
+                out = io.StringIO()
+                for percentage in storage.save_generator(
+                    out, self.element_factory, self._save_cache
+                ):
+                    status_window.progress(percentage / 2)
+                    yield
+                data = out.getvalue()
+
+                if background or self._writer.busy:
+                    self._writer.write(filename, data, write_progress, done)
+                    return
+
+                storage.write_atomic(filename, data, write_progress)
+            except Exception as e:
+                done(e)
+                raise
+            done()
+
         for _ in async_saver():
             pass
 
@@ -348,7 +389,7 @@ class FileManager(Service, ActionProvider):
         """
 
         if filename := self.filename:
-            self.save(filename)
+            self.save(filename, background=True)
         else:
             self.action_save_as()
 
@@ -359,7 +400,7 @@ class FileManager(Service, ActionProvider):
 
         return save_file_dialog(
             gettext("Save Gaphor Model As"),
-            self.save,
+            partial(self.save, background=True),
             parent=self.parent_window,
             filename=self.filename,
             extension=".gaphor",
@@ -375,6 +416,10 @@ class FileManager(Service, ActionProvider):
         else:
             load_default_model(self.element_factory)
 
+    @event_handler(TransactionCommit)
+    def _on_transaction_commit(self, event: TransactionCommit) -> None:
+        self._revision += 1
+
     @event_handler(SessionShutdownRequested)
     def _on_session_shutdown_request(self, event: SessionShutdownRequested) -> None:
         """Ask user to close window if the model has changed.
@@ -411,6 +456,69 @@ class FileManager(Service, ActionProvider):
             confirm_shutdown()
 
 
+class BackgroundWriter:
+    """Write serialized model data from a worker thread.
+
+    Only one file is written at a time. Writes requested in the meantime
+    are queued. If another write to the same file is still queued, its
+    (outdated) data is dropped and only the newest data is written. The
+    ``done`` callbacks of both writes are called when that's finished.
+
+    Progress and completion are reported back on the main thread, where
+    ``done`` is called with the error, if any. Without a running main loop
+    the data is written directly, just like ``g_async`` does.
+    """
+
+    def __init__(self):
+        self._writing = False
+        self._queue: dict[Path, tuple[str, Callable, list[Callable]]] = {}
+
+    @property
+    def busy(self) -> bool:
+        return self._writing
+
+    def write(self, filename, data, progress, done):
+        if GLib.main_depth() == 0:
+            try:
+                storage.write_atomic(filename, data, progress)
+            except Exception as e:
+                log.exception("Unable to save model %s", filename)
+                done(e)
+            else:
+                done()
+            return
+
+        _, _, done_callbacks = self._queue.pop(filename, (None, None, []))
+        self._queue[filename] = (data, progress, [*done_callbacks, done])
+        if not self._writing:
+            self._write_next()
+
+    def _write_next(self):
+        if not self._queue:
+            self._writing = False
+            return
+
+        filename = next(iter(self._queue))
+        data, progress, done_callbacks = self._queue.pop(filename)
+        self._writing = True
+
+        def finished(error=None):
+            for done in done_callbacks:
+                done(error)
+            self._write_next()
+
+        def write():
+            try:
+                storage.write_atomic(filename, data, partial(GLib.idle_add, progress))
+            except Exception as e:
+                log.exception("Unable to save model %s", filename)
+                GLib.idle_add(finished, e)
+            else:
+                GLib.idle_add(finished)
+
+        threading.Thread(target=write, name="gaphor-save", daemon=False).start()
+
+
 def resolve_merge_conflict_dialog(window: Gtk.Window, filename: Path, handler) -> None:
     dialog = Adw.MessageDialog.new(
         window,
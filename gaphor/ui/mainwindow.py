@@ -240,7 +240,7 @@ class MainWindow(Service, ActionProvider):
             else f"{gettext('New model')} - Gaphor"
         )
 
-        self.model_changed = isinstance(event, ModelLoaded) and event.modified
+        self.model_changed = event.modified
 
         window.present()
 
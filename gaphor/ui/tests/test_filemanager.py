@@ -3,8 +3,12 @@ import textwrap
 
 import pytest
 import pygit2
+from gi.repository import GLib
 
 from gaphor import UML
+from gaphor.core import event_handler
+from gaphor.event import ModelSaved
+from gaphor.transaction import Transaction
 from gaphor.ui.filemanager import FileManager
 from gaphor.storage.tests.fixtures import create_merge_conflict
 
@@ -24,6 +28,109 @@ def test_save(element_factory, file_manager: FileManager, tmp_path):
     assert out_file.exists()
 
 
+def test_save_in_background(element_factory, file_manager: FileManager, tmp_path):
+    element_factory.create(UML.Class)
+    out_file = tmp_path / "out.gaphor"
+    done = []
+
+    file_manager.save(
+        filename=out_file, on_save_done=lambda: done.append(True), background=True
+    )
+
+    assert done
+    assert file_manager.filename == out_file
+    assert list(tmp_path.iterdir()) == [out_file]
+
+
+def test_save_in_background_thread(
+    element_factory, file_manager: FileManager, tmp_path
+):
+    element_factory.create(UML.Class)
+    out_file = tmp_path / "out.gaphor"
+    loop = GLib.MainLoop()
+    done = []
+
+    def on_second_save_done():
+        done.append("second")
+        loop.quit()
+
+    def save_twice():
+        file_manager.save(
+            filename=out_file,
+            on_save_done=lambda: done.append("first"),
+            background=True,
+        )
+        element_factory.create(UML.Package)
+        file_manager.save(
+            filename=out_file, on_save_done=on_second_save_done, background=True
+        )
+
+    GLib.idle_add(save_twice)
+    GLib.timeout_add_seconds(10, loop.quit)
+    loop.run()
+
+    assert done == ["first", "second"]
+    assert "<Package " in out_file.read_text(encoding="utf-8")
+    assert list(tmp_path.iterdir()) == [out_file]
+
+
+def test_model_changed_while_saving_in_background(
+    event_manager, element_factory, file_manager: FileManager, tmp_path
+):
+    out_file = tmp_path / "out.gaphor"
+    loop = GLib.MainLoop()
+    saved = []
+
+    @event_handler(ModelSaved)
+    def on_model_saved(event):
+        saved.append(event.modified)
+        loop.quit()
+
+    event_manager.subscribe(on_model_saved)
+
+    def save_and_edit():
+        file_manager.save(filename=out_file, background=True)
+        with Transaction(event_manager):
+            element_factory.create(UML.Class)
+
+    GLib.idle_add(save_and_edit)
+    GLib.timeout_add_seconds(10, loop.quit)
+    loop.run()
+
+    assert saved == [True]
+
+
+def test_model_saved_is_not_modified(
+    event_manager, element_factory, file_manager: FileManager, tmp_path
+):
+    saved = []
+
+    @event_handler(ModelSaved)
+    def on_model_saved(event):
+        saved.append(event.modified)
+
+    event_manager.subscribe(on_model_saved)
+    with Transaction(event_manager):
+        element_factory.create(UML.Class)
+
+    file_manager.save(filename=tmp_path / "out.gaphor")
+
+    assert saved == [False]
+
+
+def test_save_replaces_existing_model(
+    element_factory, file_manager: FileManager, tmp_path
+):
+    out_file = tmp_path / "out.gaphor"
+    out_file.write_text("old model", encoding="utf-8")
+    element_factory.create(UML.Class)
+
+    file_manager.save(filename=out_file)
+
+    assert "<Class " in out_file.read_text(encoding="utf-8")
+    assert list(tmp_path.iterdir()) == [out_file]
+
+
 def test_model_is_saved_with_utf8_encoding(
     element_factory, file_manager: FileManager, tmp_path
 ):
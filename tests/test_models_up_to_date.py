@@ -96,3 +96,18 @@ def test_raaml_model(tmp_path):
     generated_model = outfile.read_text(encoding="utf-8")
 
     assert generated_model == current_model
+
+
+def test_c4model_model_parsed_in_parallel(tmp_path):
+    outfile = tmp_path / "c4model.py"
+    main(
+        modelfile="models/C4Model.gaphor",
+        supermodelfiles=[("UML", "models/UML.gaphor")],
+        outfile=outfile,
+        jobs=2,
+    )
+
+    current_model = Path(c4model.__file__).read_text(encoding="utf-8")
+    generated_model = outfile.read_text(encoding="utf-8")
+
+    assert generated_model == current_model